@@ -0,0 +1,419 @@
+-- Wealth 360 Analytics - Performance Objects
+--
+-- Precomputed objects referenced by streamlit_app_old.py and
+-- utils/data_functions.py. Run once in FSI_DEMOS.WEALTH_360 (adjust
+-- WAREHOUSE to your environment) before launching the app; Snowflake
+-- keeps them refreshed within TARGET_LAG.
+
+USE SCHEMA FSI_DEMOS.WEALTH_360;
+
+-- -----------------------------
+-- Latest position snapshot
+-- -----------------------------
+
+-- Latest snapshot timestamp per portfolio. Replaces the
+-- "MAX(TIMESTAMP) ... GROUP BY PORTFOLIO_ID" CTE that every position
+-- query used to recompute over the full POSITION_HISTORY table.
+CREATE OR REPLACE DYNAMIC TABLE LATEST_POSITION_TS
+    TARGET_LAG = '15 minutes'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
+FROM POSITION_HISTORY
+GROUP BY PORTFOLIO_ID;
+
+-- Non-cash holdings at each portfolio's latest snapshot, for queries
+-- that would otherwise join LATEST_POSITION_TS back to POSITION_HISTORY.
+-- QUALIFY keeps every row at the latest timestamp in a single scan. It runs
+-- over all rows, cash included, so the latest snapshot is the same one
+-- LATEST_POSITION_TS picks; cash is dropped only afterwards.
+CREATE OR REPLACE DYNAMIC TABLE LATEST_NONCASH_POSITIONS
+    TARGET_LAG = '15 minutes'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT PORTFOLIO_ID, TICKER, ASSET_CLASS, MARKET_VALUE
+FROM (
+    SELECT PORTFOLIO_ID, TICKER, ASSET_CLASS, MARKET_VALUE
+    FROM POSITION_HISTORY
+    QUALIFY TIMESTAMP = MAX(TIMESTAMP) OVER (PARTITION BY PORTFOLIO_ID)
+)
+WHERE TICKER <> 'CASH';
+
+-- -----------------------------
+-- Transaction statistics
+-- -----------------------------
+
+-- Per-type amount statistics for anomaly detection, maintained
+-- incrementally by Snowflake instead of aggregating all TRANSACTIONS
+-- on every dashboard load.
+CREATE OR REPLACE MATERIALIZED VIEW MV_TRANSACTION_STATS AS
+SELECT TRANSACTION_TYPE,
+       AVG(TOTAL_AMOUNT) AS AVG_AMOUNT,
+       STDDEV(TOTAL_AMOUNT) AS STDDEV_AMOUNT,
+       COUNT(*) AS TRANSACTION_COUNT
+FROM TRANSACTIONS
+WHERE TOTAL_AMOUNT > 0
+GROUP BY TRANSACTION_TYPE;
+
+-- Materialized views do not support PERCENTILE_CONT, so the 95th
+-- percentile is kept in a dynamic table refreshed hourly.
+CREATE OR REPLACE DYNAMIC TABLE TRANSACTION_P95
+    TARGET_LAG = '1 hour'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT TRANSACTION_TYPE,
+       PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY TOTAL_AMOUNT) AS P95_AMOUNT
+FROM TRANSACTIONS
+WHERE TOTAL_AMOUNT > 0
+GROUP BY TRANSACTION_TYPE;
+
+-- -----------------------------
+-- Geographic rollups
+-- -----------------------------
+
+-- One row per client with their latest-snapshot AUM (cash included). The
+-- geographic panels all aggregate this instead of re-joining CLIENTS,
+-- PORTFOLIOS and POSITION_HISTORY per query. Clients without a portfolio
+-- carry PORTFOLIO_VALUE = 0.
+CREATE OR REPLACE DYNAMIC TABLE CLIENT_AUM
+    TARGET_LAG = '1 hour'
+    WAREHOUSE = COMPUTE_WH
+AS
+WITH latest_positions AS (
+    SELECT PORTFOLIO_ID, MARKET_VALUE
+    FROM POSITION_HISTORY
+    QUALIFY TIMESTAMP = MAX(TIMESTAMP) OVER (PARTITION BY PORTFOLIO_ID)
+),
+client_portfolio_values AS (
+    SELECT p.CLIENT_ID, SUM(lp.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
+    FROM PORTFOLIOS p
+    JOIN latest_positions lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
+    GROUP BY 1
+)
+SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME,
+       c.STATE, c.CITY, c.ZIP_CODE,
+       c.NET_WORTH_ESTIMATE, c.ANNUAL_INCOME, c.RISK_TOLERANCE,
+       COALESCE(cpv.TOTAL_PORTFOLIO_VALUE, 0) AS PORTFOLIO_VALUE
+FROM CLIENTS c
+LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID;
+
+-- Per-state client and AUM rollup for the geographic distribution panel,
+-- chained off CLIENT_AUM so both refresh from the same snapshot.
+CREATE OR REPLACE DYNAMIC TABLE STATE_AUM
+    TARGET_LAG = '1 hour'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT STATE,
+       COUNT(*) AS CLIENT_COUNT,
+       SUM(PORTFOLIO_VALUE) AS TOTAL_AUM,
+       AVG(PORTFOLIO_VALUE) AS AVG_AUM_PER_CLIENT,
+       SUM(NET_WORTH_ESTIMATE) AS TOTAL_NET_WORTH,
+       AVG(ANNUAL_INCOME) AS AVG_INCOME,
+       AVG(IFF(RISK_TOLERANCE = 'Aggressive Growth', 100.0, 0.0)) AS PCT_AGGRESSIVE,
+       AVG(IFF(RISK_TOLERANCE = 'Conservative', 100.0, 0.0)) AS PCT_CONSERVATIVE
+FROM CLIENT_AUM
+WHERE STATE IS NOT NULL
+GROUP BY STATE;
+
+-- -----------------------------
+-- Reference dimensions
+-- -----------------------------
+
+-- Climate risk profile and wealth market type per state, joined by the
+-- geographic queries. States not listed fall back to 'Low Climate Risk' /
+-- 'Low' / 'Developing Market' in the app's COALESCEs.
+CREATE OR REPLACE TABLE STATE_RISK_DIM (
+    STATE VARCHAR(2),
+    PRIMARY_CLIMATE_RISK VARCHAR,
+    RISK_LEVEL VARCHAR,
+    MARKET_TYPE VARCHAR
+) AS
+SELECT $1, $2, $3, $4
+FROM VALUES
+    ('AL', 'Hurricane Risk', 'High', 'Developing Market'),
+    ('AZ', 'Drought Risk', 'Medium', 'Developing Market'),
+    ('CA', 'Wildfire Risk', 'Very High', 'High Wealth Density'),
+    ('CO', 'Wildfire Risk', 'High', 'Developing Market'),
+    ('CT', 'Low Climate Risk', 'Low', 'High Wealth Density'),
+    ('FL', 'Hurricane Risk', 'Very High', 'Medium Wealth Density'),
+    ('GA', 'Low Climate Risk', 'Low', 'Developing Market'),
+    ('IA', 'Tornado Risk', 'Medium', 'Developing Market'),
+    ('ID', 'Wildfire Risk', 'Low', 'Developing Market'),
+    ('IL', 'Tornado Risk', 'Medium', 'Medium Wealth Density'),
+    ('IN', 'Tornado Risk', 'Low', 'Developing Market'),
+    ('KS', 'Tornado Risk', 'Medium', 'Developing Market'),
+    ('LA', 'Hurricane Risk', 'Very High', 'Developing Market'),
+    ('MA', 'Low Climate Risk', 'Low', 'High Wealth Density'),
+    ('MI', 'Winter Storm Risk', 'Low', 'Developing Market'),
+    ('MN', 'Winter Storm Risk', 'Low', 'Developing Market'),
+    ('MO', 'Tornado Risk', 'Medium', 'Developing Market'),
+    ('MS', 'Hurricane Risk', 'High', 'Developing Market'),
+    ('MT', 'Wildfire Risk', 'Low', 'Developing Market'),
+    ('NC', 'Hurricane Risk', 'Very High', 'Developing Market'),
+    ('ND', 'Winter Storm Risk', 'Low', 'Developing Market'),
+    ('NE', 'Tornado Risk', 'Low', 'Developing Market'),
+    ('NJ', 'Low Climate Risk', 'Low', 'High Wealth Density'),
+    ('NM', 'Drought Risk', 'Low', 'Developing Market'),
+    ('NV', 'Drought Risk', 'Medium', 'Developing Market'),
+    ('NY', 'Winter Storm Risk', 'Low', 'High Wealth Density'),
+    ('OH', 'Low Climate Risk', 'Low', 'Developing Market'),
+    ('OK', 'Tornado Risk', 'Medium', 'Developing Market'),
+    ('OR', 'Wildfire Risk', 'High', 'Developing Market'),
+    ('PA', 'Low Climate Risk', 'Low', 'Developing Market'),
+    ('SC', 'Hurricane Risk', 'High', 'Developing Market'),
+    ('SD', 'Winter Storm Risk', 'Low', 'Developing Market'),
+    ('TX', 'Hurricane Risk', 'Very High', 'Medium Wealth Density'),
+    ('UT', 'Drought Risk', 'Low', 'Developing Market'),
+    ('VA', 'Low Climate Risk', 'Low', 'Medium Wealth Density'),
+    ('VT', 'Winter Storm Risk', 'Low', 'Developing Market'),
+    ('WA', 'Wildfire Risk', 'High', 'Medium Wealth Density'),
+    ('WI', 'Winter Storm Risk', 'Low', 'Developing Market');
+
+-- Sectors whose earnings are sensitive to weather, listed against every
+-- high-risk location in the climate risk panel.
+CREATE OR REPLACE TABLE WEATHER_SECTOR_DIM (
+    SECTOR VARCHAR,
+    WEATHER_SENSITIVITY VARCHAR,
+    RISK_FACTORS VARCHAR
+) AS
+SELECT $1, $2, $3
+FROM VALUES
+    ('Agriculture', 'High', 'Drought, Flooding, Temperature'),
+    ('Energy', 'High', 'Hurricanes, Temperature Extremes'),
+    ('Insurance', 'Very High', 'Natural Disasters, Climate Events'),
+    ('Real Estate', 'Medium', 'Flooding, Hurricanes, Wildfires'),
+    ('Tourism', 'High', 'Weather Patterns, Seasonal Changes'),
+    ('Utilities', 'Medium', 'Storm Damage, Peak Demand');
+
+-- Approximate geographic centre of each state and territory, used to place
+-- clients and advisors on the maps and to measure advisor travel distance.
+CREATE OR REPLACE TABLE STATE_CENTROID (
+    STATE VARCHAR(2),
+    STATE_NAME VARCHAR,
+    LATITUDE FLOAT,
+    LONGITUDE FLOAT
+) AS
+SELECT $1, $2, $3, $4
+FROM VALUES
+    ('AL', 'Alabama', 32.806671, -86.791130),
+    ('AK', 'Alaska', 61.570716, -152.404419),
+    ('AZ', 'Arizona', 33.729759, -111.431221),
+    ('AR', 'Arkansas', 34.969704, -92.373123),
+    ('CA', 'California', 36.116203, -119.681564),
+    ('CO', 'Colorado', 39.059811, -105.311104),
+    ('CT', 'Connecticut', 41.767, -72.677),
+    ('DE', 'Delaware', 39.161921, -75.526755),
+    ('FL', 'Florida', 27.4518, -81.5158),
+    ('GA', 'Georgia', 32.9866, -83.6487),
+    ('HI', 'Hawaii', 21.1098, -157.5311),
+    ('ID', 'Idaho', 44.931109, -116.237651),
+    ('IL', 'Illinois', 40.349457, -88.986137),
+    ('IN', 'Indiana', 39.790942, -86.147685),
+    ('IA', 'Iowa', 42.011539, -93.210526),
+    ('KS', 'Kansas', 38.572954, -98.580009),
+    ('KY', 'Kentucky', 37.669773, -84.670067),
+    ('LA', 'Louisiana', 31.266683, -91.988312),
+    ('ME', 'Maine', 45.367584, -68.972168),
+    ('MD', 'Maryland', 39.161921, -75.526755),
+    ('MA', 'Massachusetts', 42.2352, -71.0275),
+    ('MI', 'Michigan', 43.354558, -84.955255),
+    ('MN', 'Minnesota', 45.7326, -93.9196),
+    ('MS', 'Mississippi', 32.7673, -89.6812),
+    ('MO', 'Missouri', 38.572954, -92.189283),
+    ('MT', 'Montana', 47.052632, -110.454353),
+    ('NE', 'Nebraska', 41.590939, -99.675285),
+    ('NV', 'Nevada', 39.161921, -117.055374),
+    ('NH', 'New Hampshire', 43.452492, -71.563896),
+    ('NJ', 'New Jersey', 40.221741, -74.756138),
+    ('NM', 'New Mexico', 34.307144, -106.018066),
+    ('NY', 'New York', 42.659829, -75.615011),
+    ('NC', 'North Carolina', 35.771, -78.638),
+    ('ND', 'North Dakota', 47.259, -99.955),
+    ('OH', 'Ohio', 40.269789, -82.955255),
+    ('OK', 'Oklahoma', 35.482309, -97.534994),
+    ('OR', 'Oregon', 44.931109, -123.029159),
+    ('PA', 'Pennsylvania', 40.269789, -77.727883),
+    ('RI', 'Rhode Island', 41.82355, -71.422132),
+    ('SC', 'South Carolina', 33.836082, -81.163727),
+    ('SD', 'South Dakota', 44.268543, -99.672985),
+    ('TN', 'Tennessee', 35.771, -86.25),
+    ('TX', 'Texas', 31.106, -97.6475),
+    ('UT', 'Utah', 39.161921, -111.431221),
+    ('VT', 'Vermont', 44.26639, -72.580536),
+    ('VA', 'Virginia', 37.54, -78.64),
+    ('WA', 'Washington', 47.042418, -122.893077),
+    ('WV', 'West Virginia', 38.349497, -81.633294),
+    ('WI', 'Wisconsin', 44.95, -89.5),
+    ('WY', 'Wyoming', 42.7475, -107.2085);
+
+-- Great-circle distance in miles from each advisor's region (a state name)
+-- to every state centroid. The territory panel looks distances up here
+-- instead of estimating them per row.
+CREATE OR REPLACE DYNAMIC TABLE ADVISOR_STATE_DISTANCE
+    TARGET_LAG = '1 day'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT a.ADVISOR_ID, s.STATE,
+       ST_DISTANCE(
+           ST_MAKEPOINT(o.LONGITUDE, o.LATITUDE),
+           ST_MAKEPOINT(s.LONGITUDE, s.LATITUDE)
+       ) / 1609.34 AS MILES
+FROM ADVISORS a
+JOIN STATE_CENTROID o ON a.REGION = o.STATE_NAME
+CROSS JOIN STATE_CENTROID s;
+
+-- -----------------------------
+-- Client contact recency
+-- -----------------------------
+
+-- Most recent interaction per client, shared by event-driven outreach and
+-- the KYC review queue. Days-since is computed at query time so the table
+-- stays free of CURRENT_DATE and can refresh incrementally.
+CREATE OR REPLACE DYNAMIC TABLE CLIENT_LAST_CONTACT
+    TARGET_LAG = '1 hour'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT CLIENT_ID, MAX(TIMESTAMP) AS LAST_CONTACT
+FROM INTERACTIONS
+GROUP BY CLIENT_ID;
+
+-- -----------------------------
+-- Interaction note tags
+-- -----------------------------
+
+-- Sentiment and issue tags are derived once per interaction instead of
+-- regex-scanning OUTCOME_NOTES on every dashboard load. Kept in a dynamic
+-- table keyed by INTERACTION_ID so INTERACTIONS itself is left untouched
+-- and only new or changed notes are processed on refresh. The keyword
+-- patterns and their order match SENTIMENT_RULES / ISSUE_CATEGORY_RULES in
+-- the app, which also tags rows newer than the last refresh; Cortex
+-- SENTIMENT / CLASSIFY_TEXT would label differently from that fallback and
+-- bill per note, so the existing rules are kept.
+CREATE OR REPLACE DYNAMIC TABLE INTERACTION_TAGS
+    TARGET_LAG = '1 hour'
+    WAREHOUSE = COMPUTE_WH
+AS
+SELECT
+    INTERACTION_ID,
+    CASE
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'satisfied|happy|pleased|excellent', 1, 1, 0, 'i') > 0 THEN 'Positive'
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'dissatisfied|unhappy|frustrated|angry|complaint', 1, 1, 0, 'i') > 0 THEN 'Negative'
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'concerned|worried|question|clarification', 1, 1, 0, 'i') > 0 THEN 'Neutral/Concerned'
+        ELSE 'Neutral'
+    END AS SENTIMENT_TAG,
+    CASE
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'fee', 1, 1, 0, 'i') > 0 THEN 'Fees'
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'performance|return|loss', 1, 1, 0, 'i') > 0 THEN 'Performance'
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'service|response|wait', 1, 1, 0, 'i') > 0 THEN 'Service Quality'
+        WHEN REGEXP_INSTR(OUTCOME_NOTES, 'advisor|relationship', 1, 1, 0, 'i') > 0 THEN 'Advisor Relationship'
+        ELSE 'General'
+    END AS ISSUE_TAG
+FROM INTERACTIONS
+WHERE OUTCOME_NOTES IS NOT NULL;
+
+-- Earlier versions tagged INTERACTIONS in place with a 5-minute task
+DROP TASK IF EXISTS TAG_INTERACTIONS_TASK;
+-- ALTER TABLE INTERACTIONS DROP COLUMN SENTIMENT_TAG, ISSUE_TAG;
+
+-- -----------------------------
+-- Persistent result cache
+-- -----------------------------
+
+-- Parquet copies of large query results shared by all app replicas
+-- (see persistent_cache in streamlit_app_old.py). Override the name with
+-- the WEALTH360_CACHE_STAGE environment variable.
+CREATE STAGE IF NOT EXISTS WEALTH360_RESULT_CACHE
+    ENCRYPTION = (TYPE = 'SNOWFLAKE_SSE');
+
+-- -----------------------------
+-- Query usage log and prewarm
+-- -----------------------------
+
+-- Opt-in: when WEALTH360_USAGE_LOG_TABLE names this table, the app appends
+-- one row per query cache miss in batches (see _record_query_usage). Only
+-- the MD5 of the SQL text, the latency and the number of bind values are
+-- kept; SQL text and bind values (client ids) are never stored. Replaces the
+-- earlier layout that logged both.
+CREATE OR REPLACE TABLE QUERY_USAGE_LOG (
+    QUERY_HASH VARCHAR(32),
+    EXECUTED_AT TIMESTAMP_NTZ,
+    DURATION_MS FLOAT,
+    BIND_COUNT INTEGER
+);
+
+-- Drop usage rows older than 30 days, then re-run the TOP_K most frequent
+-- statements of the past week so their results sit in the 24-hour result
+-- cache before the first user arrives. Statement text is recovered from
+-- ACCOUNT_USAGE.QUERY_HISTORY by hash (the owning role needs IMPORTED
+-- PRIVILEGES on the SNOWFLAKE database); only statements without bind values
+-- can be replayed, since the values themselves are not logged.
+CREATE OR REPLACE PROCEDURE PREWARM_HOT_QUERIES(TOP_K INTEGER)
+RETURNS INTEGER
+LANGUAGE SQL
+AS
+$$
+DECLARE
+    warmed INTEGER DEFAULT 0;
+    hot RESULTSET;
+BEGIN
+    DELETE FROM QUERY_USAGE_LOG
+    WHERE EXECUTED_AT < DATEADD(DAY, -30, CURRENT_TIMESTAMP());
+
+    hot := (
+        WITH ranked AS (
+            SELECT QUERY_HASH, COUNT(*) AS CALLS
+            FROM QUERY_USAGE_LOG
+            WHERE EXECUTED_AT >= DATEADD(DAY, -7, CURRENT_TIMESTAMP())
+              AND BIND_COUNT = 0
+            GROUP BY QUERY_HASH
+            ORDER BY CALLS DESC
+            LIMIT :TOP_K
+        )
+        SELECT ANY_VALUE(q.QUERY_TEXT) AS QUERY_TEXT
+        FROM ranked r
+        JOIN SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY q
+          ON MD5(q.QUERY_TEXT) = r.QUERY_HASH
+        WHERE q.START_TIME >= DATEADD(DAY, -7, CURRENT_TIMESTAMP())
+        GROUP BY r.QUERY_HASH
+    );
+    LET hot_cursor CURSOR FOR hot;
+    FOR rec IN hot_cursor DO
+        LET stmt VARCHAR := rec.QUERY_TEXT;
+        EXECUTE IMMEDIATE :stmt;
+        warmed := warmed + 1;
+    END FOR;
+    RETURN warmed;
+END;
+$$;
+
+-- Weekday pre-market run (also applies the log retention); the app must
+-- use the same role for cache hits.
+CREATE OR REPLACE TASK PREWARM_HOT_QUERIES_TASK
+    WAREHOUSE = COMPUTE_WH
+    SCHEDULE = 'USING CRON 30 6 * * MON-FRI America/New_York'
+AS
+    CALL PREWARM_HOT_QUERIES(20);
+
+ALTER TASK PREWARM_HOT_QUERIES_TASK RESUME;
+
+-- -----------------------------
+-- Clustering and search optimization
+-- -----------------------------
+
+-- Time-window filters (churn, market events, AUM, drift) and the
+-- latest-snapshot lookups prune micro-partitions by portfolio and time.
+ALTER TABLE POSITION_HISTORY CLUSTER BY (PORTFOLIO_ID, TIMESTAMP);
+
+-- Trade anomalies and interaction summaries / sentiment filter on
+-- TIMESTAMP >= DATEADD(DAY, -N, ...). Day granularity keeps the key's
+-- cardinality low so reclustering stays cheap while still pruning.
+ALTER TABLE TRANSACTIONS CLUSTER BY (DATE_TRUNC('DAY', TIMESTAMP));
+ALTER TABLE INTERACTIONS CLUSTER BY (DATE_TRUNC('DAY', TIMESTAMP));
+
+-- Check pruning quality after the initial recluster:
+-- SELECT SYSTEM$CLUSTERING_INFORMATION('TRANSACTIONS');
+-- SELECT SYSTEM$CLUSTERING_INFORMATION('INTERACTIONS');
+
+-- Optional (Enterprise Edition): point lookups by portfolio, e.g. the
+-- client briefing's per-client position queries.
+-- ALTER TABLE POSITION_HISTORY ADD SEARCH OPTIMIZATION ON EQUALITY(PORTFOLIO_ID);
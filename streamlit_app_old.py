@@ -10,17 +10,37 @@ Version: 1.0.0
 License: MIT
 """
 
+import functools
+import hashlib
 import logging
 import os
-from typing import Any, Dict, Optional
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import pydeck as pdk
 import streamlit as st
+from plotly.subplots import make_subplots
 from snowflake.snowpark import Session
 from snowflake.snowpark.context import get_active_session
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; kernels then run as plain Python
+    njit = None
+    prange = range
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +53,12 @@ logger = logging.getLogger(__name__)
 # Configuration and Connection (Snowpark-first for Streamlit in Snowflake)
 # -----------------------------
 
+# Probe for Streamlit in Snowflake once at import instead of on every lookup
+try:
+    _IN_SIS = get_active_session() is not None
+except Exception:
+    _IN_SIS = False
+
 
 def _read_secrets_prefixed(prefix: str) -> Dict[str, Optional[str]]:
     """
@@ -53,29 +79,21 @@ def _read_secrets_prefixed(prefix: str) -> Dict[str, Optional[str]]:
         if env_val:
             return env_val
 
-        # Only try Streamlit secrets if we're in a local development environment
         # Skip secrets entirely in Streamlit in Snowflake to avoid errors
-        try:
-            # Check if we're likely in Streamlit in Snowflake by looking for active session
-            from snowflake.snowpark.context import get_active_session
-
-            get_active_session()
-            # If we get here without exception, we're in Streamlit in Snowflake
-            # Don't try to access secrets
+        if _IN_SIS:
             return None
+
+        try:
+            if hasattr(st, "secrets"):
+                if prefix in st.secrets:
+                    section = st.secrets[prefix]
+                    return section.get(key)
+                if prefix.lower() in st.secrets:
+                    section = st.secrets[prefix.lower()]
+                    return section.get(key)
         except Exception:
-            # We're in local development, try secrets
-            try:
-                if hasattr(st, "secrets"):
-                    if prefix in st.secrets:
-                        section = st.secrets[prefix]
-                        return section.get(key)
-                    if prefix.lower() in st.secrets:
-                        section = st.secrets[prefix.lower()]
-                        return section.get(key)
-            except Exception:
-                # Secrets not available or accessible
-                pass
+            # Secrets not available or accessible
+            pass
 
         return None
 
@@ -92,10 +110,64 @@ def _read_secrets_prefixed(prefix: str) -> Dict[str, Optional[str]]:
     return values
 
 
-@st.cache_resource(show_spinner=False)
+_SESSION: Optional[Session] = None
+_SESSION_LOCK = threading.Lock()
+
+# Set on prefetch worker threads. Their Streamlit calls would land outside
+# the tab that asked for the data, so query helpers re-raise there instead
+# of calling st.error; the tab's own call then fails and reports in place.
+_PREFETCH_THREAD = threading.local()
+
+
+def _in_prefetch_worker() -> bool:
+    return getattr(_PREFETCH_THREAD, "active", False)
+
+
+def _is_connection_alive(sess: Session) -> bool:
+    """
+    Whether the session's connector connection is still open.
+
+    This is a local flag check rather than a ``SELECT 1`` probe, so it is
+    cheap enough to run on every query; a dropped connection then triggers
+    one reconnect instead of failing every query until the app restarts.
+    """
+    try:
+        return not sess.connection.is_closed()
+    except Exception:
+        return False
+
+
 def get_snowflake_session() -> Session:
     """
-    Get Snowflake session - prioritizes active session in Streamlit in Snowflake,
+    Return the process-wide Snowpark session, building it on first use.
+
+    Hot paths call this for every query, so the session is memoized in a
+    module global instead of going through st.cache_resource hashing. That
+    global is reset whenever Streamlit re-executes this script, so the
+    builder itself is held in st.cache_resource and every rerun reuses the
+    same logged-in session. A single shared session is used rather than one
+    per thread: Streamlit runs each rerun on a fresh thread, and Snowpark
+    sessions are thread-safe.
+
+    Returns:
+        Snowflake Snowpark Session object
+
+    Raises:
+        RuntimeError: If session cannot be established
+    """
+    global _SESSION
+    session = _SESSION
+    if session is None or not _is_connection_alive(session):
+        with _SESSION_LOCK:
+            if _SESSION is None or not _is_connection_alive(_SESSION):
+                _SESSION = _build_session()
+    return _SESSION
+
+
+@st.cache_resource(show_spinner=False, validate=_is_connection_alive)
+def _build_session() -> Session:
+    """
+    Build Snowflake session - prioritizes active session in Streamlit in Snowflake,
     falls back to credentials-based session for local development.
 
     Returns:
@@ -157,37 +229,493 @@ def get_snowflake_session() -> Session:
     return Session.builder.configs(connection_parameters).create()
 
 
-@st.cache_data(ttl=600, show_spinner=False)
-def run_query(sql: str) -> pd.DataFrame:
+# Cache lifetimes: FAST_TTL for queries over recent activity or driven by
+# widget values, MEDIUM_TTL for loaders over hourly dynamic tables, static
+# dimensions and mined trade/interaction history, SLOW_TTL for firm-level
+# figures that only move once a day. BRIEFING_TTL keeps per-client
+# briefings current while an advisor works through a client list.
+FAST_TTL = 600
+MEDIUM_TTL = 15 * 60
+SLOW_TTL = 24 * 60 * 60
+BRIEFING_TTL = 5 * 60
+
+
+@st.cache_resource(ttl=FAST_TTL, show_spinner=False)
+def _cached_arrow(
+    sql: str,
+    params: Tuple[Any, ...] = (),
+    persist: bool = False,
+    downcast: bool = True,
+) -> pa.Table:
+    """
+    Execute SQL once and cache the immutable Arrow result, keyed by SQL text
+    and bind values.
+
+    cache_resource hands back the same object on every hit instead of
+    pickling a DataFrame copy, so all readers share the Arrow buffers.
+    Failures raise and are therefore never cached. With ``persist`` the
+    result is also read from / written to the Parquet stage cache; with
+    ``downcast`` numeric columns are narrowed once, before caching.
+    """
+    session = get_snowflake_session()
+    logger.debug(f"Executing query: {sql[:100]}...")
+    fetch = _fetch_arrow_persistent if persist else _fetch_arrow
+    started = time.perf_counter()
+    table = fetch(session, sql, params)
+    _record_query_usage(sql, len(params), (time.perf_counter() - started) * 1000)
+    logger.info(f"Query returned {table.num_rows} rows")
+    return _downcast_table(table) if downcast else table
+
+
+def run_query(
+    sql: str,
+    params: Sequence[Any] = (),
+    return_arrow: bool = False,
+    persist: bool = False,
+    downcast: bool = True,
+) -> Any:
     """
     Execute SQL query and return results as pandas DataFrame.
 
+    Results are fetched from Snowflake in batches and cached as a shared
+    pyarrow Table; each call builds its own DataFrame over it. The
+    Table itself must never be mutated, so callers using ``return_arrow``
+    should treat it as read-only.
+
+    Variable values (windows, thresholds, ids) should be passed as ``?`` binds
+    via ``params`` rather than formatted into the SQL, so the statement text
+    stays constant and Snowflake can reuse the compiled plan.
+
+    TRANSACTIONS, INTERACTIONS and POSITION_HISTORY are clustered on time
+    (see sql/performance_objects.sql), so recent-window queries should filter
+    on the raw ``TIMESTAMP >= DATEADD(...)`` column, not an expression over
+    it, to keep micro-partition pruning effective.
+
+    When usage logging is enabled, every cache miss is queued for the
+    QUERY_USAGE_LOG table so the nightly prewarm task can re-run the most
+    frequent statements.
+
     Args:
         sql: SQL query string to execute
+        params: Values bound positionally to ``?`` placeholders
+        return_arrow: Return the pyarrow Table instead of a DataFrame
+        persist: Share large results across app restarts via the stage cache
+        downcast: Narrow integer columns to int32 where values fit
+            (floats keep full precision); pass False to keep the raw result
+            types. CATEGORY_COLUMNS and
+            RISK_* text columns are always returned as categoricals
 
     Returns:
-        pandas DataFrame with query results
+        pandas DataFrame (or pyarrow Table) with query results
 
     Raises:
         Exception: If query execution fails
     """
     try:
-        session = get_snowflake_session()
-        logger.debug(f"Executing query: {sql[:100]}...")
-        result = session.sql(sql).to_pandas()
-        logger.info(f"Query returned {len(result)} rows")
-        return result
+        table = _cached_arrow(sql, tuple(params), persist, downcast)
+        return table if return_arrow else _arrow_to_pandas(table)
     except Exception as e:
         logger.error(f"Query execution failed: {e}")
+        if _in_prefetch_worker():
+            raise
         st.error(f"Database query failed: {str(e)}")
+        if return_arrow:
+            return pa.table({})
         return pd.DataFrame()  # Return empty DataFrame on error
 
 
+def _fetch_arrow(
+    session: Session, sql: str, params: Sequence[Any] = ()
+) -> pa.Table:
+    """
+    Execute SQL on the given session and return the result as a pyarrow Table.
+
+    Values are bound through Snowpark's ``session.sql(..., params=...)``,
+    which binds ``?`` placeholders whatever paramstyle the underlying
+    connector was opened with (a raw connector cursor defaults to pyformat
+    and would not bind them). Result batches arrive as Arrow tables and
+    become the chunks of one Table, so no intermediate pandas frame is
+    built. Batches may infer different types for the same column (e.g.
+    all-NULL chunks); only those chunks are cast by the permissive
+    promotion.
+
+    Makes no Streamlit calls, so it is safe to run from worker threads.
+    """
+    frame = session.sql(sql, params=list(params) or None)
+    chunks = list(frame.to_arrow_batches())
+    if not chunks:
+        # No batches are produced for empty result sets
+        return pa.table({name: pa.array([], pa.null()) for name in frame.columns})
+    return pa.concat_tables(chunks, promote_options="permissive")
+
+
+# -----------------------------
+# Persistent Result Cache (Parquet on stage)
+# -----------------------------
+
+CACHE_STAGE = os.environ.get("WEALTH360_CACHE_STAGE", "@WEALTH360_RESULT_CACHE")
+PERSISTENT_CACHE_TTL = 3600
+PERSISTENT_CACHE_MIN_ROWS = 1_000
+
+
+def _stage_cache_get(session: Session, key: str, ttl: int) -> Optional[pa.Table]:
+    """Return the cached Parquet result for ``key`` if it is younger than ttl."""
+    path = f"{CACHE_STAGE}/{key}.parquet"
+    listing = session.sql(f"LIST {path}").collect()
+    if not listing:
+        return None
+    modified = parsedate_to_datetime(listing[0]["last_modified"]).timestamp()
+    if time.time() - modified > ttl:
+        return None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        session.file.get(path, tmp_dir)
+        return pq.read_table(os.path.join(tmp_dir, f"{key}.parquet"))
+
+
+def _stage_cache_put(session: Session, key: str, table: pa.Table) -> None:
+    """Upload ``table`` to the stage cache as ``<key>.parquet``."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        local_path = os.path.join(tmp_dir, f"{key}.parquet")
+        pq.write_table(table, local_path)
+        session.file.put(local_path, CACHE_STAGE, auto_compress=False, overwrite=True)
+
+
+def persistent_cache(
+    ttl: int = PERSISTENT_CACHE_TTL, min_rows: int = PERSISTENT_CACHE_MIN_ROWS
+) -> Callable:
+    """
+    Back an Arrow fetch function with Parquet files on an internal stage.
+
+    Results are keyed by a blake2b hash of the SQL text and bind values, so
+    every app replica shares them and cold starts skip the warehouse while
+    the file is younger than ``ttl`` seconds. Results under ``min_rows`` are
+    not persisted; the in-memory cache is enough for those. Stage errors are
+    logged and fall through to Snowflake.
+    """
+
+    def decorator(fetch: Callable[..., pa.Table]) -> Callable[..., pa.Table]:
+        @functools.wraps(fetch)
+        def wrapper(session: Session, sql: str, params: Sequence[Any] = ()) -> pa.Table:
+            key = hashlib.blake2b(
+                repr((sql, tuple(params))).encode(), digest_size=16
+            ).hexdigest()
+            try:
+                table = _stage_cache_get(session, key, ttl)
+                if table is not None:
+                    logger.info(f"Stage cache hit for {key}")
+                    return table
+            except Exception as e:
+                logger.warning(f"Stage cache read failed for {key}: {e}")
+
+            table = fetch(session, sql, params)
+            if table.num_rows >= min_rows:
+                try:
+                    _stage_cache_put(session, key, table)
+                except Exception as e:
+                    logger.warning(f"Stage cache write failed for {key}: {e}")
+            return table
+
+        return wrapper
+
+    return decorator
+
+
+_fetch_arrow_persistent = persistent_cache()(_fetch_arrow)
+
+
+# -----------------------------
+# Query Usage Log
+# -----------------------------
+
+# Usage logging is opt-in: set WEALTH360_USAGE_LOG_TABLE (e.g. to
+# QUERY_USAGE_LOG) to record query cache misses for the prewarm task
+USAGE_LOG_TABLE = os.environ.get("WEALTH360_USAGE_LOG_TABLE", "")
+USAGE_FLUSH_INTERVAL = 300
+USAGE_FLUSH_BATCH = 500
+
+
+def _flush_usage_loop(usage_queue: "queue.Queue[Tuple[Any, ...]]") -> None:
+    """Periodically drain queued usage rows into USAGE_LOG_TABLE."""
+    while True:
+        time.sleep(USAGE_FLUSH_INTERVAL)
+        rows = []
+        while True:
+            try:
+                rows.append(usage_queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(rows), USAGE_FLUSH_BATCH):
+            batch = rows[start : start + USAGE_FLUSH_BATCH]
+            try:
+                get_snowflake_session().sql(
+                    f"INSERT INTO {USAGE_LOG_TABLE} "
+                    "(QUERY_HASH, EXECUTED_AT, DURATION_MS, BIND_COUNT) VALUES "
+                    + ", ".join(["(?, ?, ?, ?)"] * len(batch)),
+                    params=[value for row in batch for value in row],
+                ).collect()
+            except Exception as e:
+                logger.warning(
+                    f"Usage log flush failed, dropped {len(batch)} rows: {e}"
+                )
+
+
+@st.cache_resource(show_spinner=False)
+def _usage_log_queue() -> "queue.Queue[Tuple[Any, ...]]":
+    """
+    Process-wide queue of query cache misses, flushed by one daemon thread.
+
+    Held in cache_resource so script reruns reuse the same queue and thread.
+    """
+    usage_queue: "queue.Queue[Tuple[Any, ...]]" = queue.Queue()
+    threading.Thread(
+        target=_flush_usage_loop,
+        args=(usage_queue,),
+        name="wealth360-usage-log",
+        daemon=True,
+    ).start()
+    return usage_queue
+
+
+def _record_query_usage(sql: str, bind_count: int, duration_ms: float) -> None:
+    """
+    Queue one executed statement for the usage log without blocking the caller.
+
+    Only the MD5 of the SQL text, the time, the latency and the number of
+    bind values are kept; neither the text nor the bound values (which can be
+    client ids) are logged. The hash matches Snowflake's MD5() of QUERY_TEXT
+    in query history, which is where the prewarm task looks statements up.
+    """
+    if not USAGE_LOG_TABLE:
+        return
+    _usage_log_queue().put(
+        (
+            hashlib.md5(sql.encode()).hexdigest(),
+            time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+            round(duration_ms, 1),
+            bind_count,
+        )
+    )
+
+
+def _downcast_table(table: pa.Table) -> pa.Table:
+    """
+    Narrow integer columns: int64 or whole-number NUMBER columns become
+    int32 when every value fits, else int64. Fractional NUMBER (decimal)
+    columns such as NUMBER(p,2) currency become float64, and float64
+    columns are kept as they are, because float32 holds only ~7
+    significant digits and AUM, cash and market values routinely need more.
+    """
+    int32 = np.iinfo(np.int32)
+    fields = []
+    for field in table.schema:
+        if pa.types.is_decimal(field.type) and field.type.scale > 0:
+            field = field.with_type(pa.float64())
+        elif pa.types.is_int64(field.type) or pa.types.is_decimal(field.type):
+            bounds = pc.min_max(table[field.name]).as_py()
+            lo, hi = bounds["min"], bounds["max"]
+            if lo is None or (int32.min <= lo and hi <= int32.max):
+                field = field.with_type(pa.int32())
+            elif pa.types.is_decimal(field.type):
+                field = field.with_type(pa.int64())
+        fields.append(field)
+    schema = pa.schema(fields, metadata=table.schema.metadata)
+    # Skip the cast entirely when nothing narrows, leaving the buffers shared
+    return table if schema.equals(table.schema) else table.cast(schema)
+
+
+# Low-cardinality text columns stored as pandas categoricals (plus RISK_*):
+# locations, and the label columns the panels color and group by
+CATEGORY_COLUMNS = (
+    "STATE",
+    "CITY",
+    "PRIMARY_CLIMATE_RISK",
+    "WEATHER_SENSITIVITY",
+    "COVERAGE_TYPE",
+    "MARKET_TYPE",
+    "OPPORTUNITY_LEVEL",
+    "RECOMMENDED_STRATEGY",
+    "KYC_STATUS",
+    "RECOMMENDED_ACTIONS",
+)
+
+
+def _arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert an Arrow result to pandas, keeping Arrow-backed column buffers.
+
+    Location and label columns repeat a few values across many rows, so
+    they become categoricals holding each string once.
+    """
+    df = table.to_pandas(zero_copy_only=False, types_mapper=pd.ArrowDtype)
+    for field in table.schema:
+        if not (
+            pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+        ):
+            continue
+        if field.name in CATEGORY_COLUMNS or field.name.startswith("RISK_"):
+            df[field.name] = df[field.name].astype("category")
+    return df
+
+
+def _fetch_pandas(
+    session: Session, sql: str, params: Sequence[Any] = ()
+) -> pd.DataFrame:
+    """
+    Execute SQL on the given session and return a pandas DataFrame with
+    numeric columns downcast as in run_query.
+
+    Makes no Streamlit calls, so it is safe to run from worker threads.
+    """
+    return _arrow_to_pandas(_downcast_table(_fetch_arrow(session, sql, params)))
+
+
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def _cached_row(sql: str, params: Tuple[Any, ...] = ()) -> Dict[str, Any]:
+    """
+    Cached single-row fetch behind run_row.
+
+    Errors propagate so st.cache_data never stores a failed lookup.
+    """
+    session = get_snowflake_session()
+    rows = session.sql(sql, params=list(params) or None).collect()
+    return rows[0].as_dict() if rows else {}
+
+
+def run_row(sql: str, params: Sequence[Any] = ()) -> Dict[str, Any]:
+    """
+    Execute a single-row SQL query and return it as a dict of Python scalars.
+
+    Uses collect() so small KPI lookups skip Arrow conversion and DataFrame
+    construction entirely. Use run_query for multi-row results.
+
+    Args:
+        sql: SQL query string returning at most one row
+        params: Values bound positionally to ``?`` placeholders
+
+    Returns:
+        Column name to value mapping (empty on failure or no rows)
+    """
+    try:
+        return _cached_row(sql, tuple(params))
+    except Exception as e:
+        logger.error(f"Query execution failed: {e}")
+        if _in_prefetch_worker():
+            raise
+        st.error(f"Database query failed: {str(e)}")
+        return {}
+
+
+def _require_rows(result: Any, what: str) -> Any:
+    """
+    Raise instead of returning an empty result from a SLOW_TTL loader.
+
+    run_query and run_row report failures on the page and return an empty
+    result; raising keeps st.cache_data from pinning that for a whole day.
+    """
+    if len(result) == 0:
+        raise RuntimeError(f"{what} returned no rows")
+    return result
+
+
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def run_queries_parallel(
+    sqls: Dict[str, str], params: Sequence[Any] = ()
+) -> Dict[str, pd.DataFrame]:
+    """
+    Execute independent SQL queries concurrently and return results by key.
+
+    Snowpark sessions are thread-safe (snowflake-snowpark-python >= 1.24), so the
+    statements are submitted on the shared session and Snowflake runs them in
+    parallel; wall time is bounded by the slowest query instead of the sum.
+
+    Args:
+        sqls: Mapping of result key to SQL query string
+        params: Values bound to the ``?`` placeholders of every statement
+
+    Returns:
+        Mapping of result key to pandas DataFrame (empty on failure)
+    """
+    results: Dict[str, pd.DataFrame] = {}
+    if not sqls:
+        return results
+
+    try:
+        session = get_snowflake_session()
+    except Exception as e:
+        logger.error(f"Query execution failed: {e}")
+        st.error(f"Database query failed: {str(e)}")
+        return {key: pd.DataFrame() for key in sqls}
+
+    with ThreadPoolExecutor(max_workers=min(8, len(sqls))) as executor:
+        futures = {
+            key: executor.submit(_fetch_pandas, session, sql, params)
+            for key, sql in sqls.items()
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+                logger.info(f"Query '{key}' returned {len(results[key])} rows")
+            except Exception as e:
+                logger.error(f"Query '{key}' execution failed: {e}")
+                st.error(f"Database query failed: {str(e)}")
+                results[key] = pd.DataFrame()
+    return results
+
+
+def iter_loaded_groups(groups: Sequence[Sequence[Callable[[], Any]]]) -> Iterator[int]:
+    """
+    Run every loader in ``groups`` concurrently and yield each group's index
+    as soon as all of its loaders have finished.
+
+    Callers can render a group's panel while the other groups are still
+    loading. Worker threads are attached to the current script run so
+    st.cache_data behaves as on the main thread, and are marked so query
+    failures raise rather than render; the panels' own loader calls are then
+    cache hits, or retry and report the error where it belongs.
+    """
+    ctx = get_script_run_ctx()
+
+    def load(loader: Callable[[], Any]) -> Any:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        _PREFETCH_THREAD.active = True
+        return loader()
+
+    remaining = [len(group) for group in groups]
+    with ThreadPoolExecutor(max_workers=min(8, sum(remaining))) as executor:
+        futures = {
+            executor.submit(load, loader): index
+            for index, group in enumerate(groups)
+            for loader in group
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"Prefetch failed: {e}")
+            index = futures[future]
+            remaining[index] -= 1
+            if not remaining[index]:
+                yield index
+
+
+def prefetch_loaders(*loaders: Callable[[], Any]) -> None:
+    """
+    Warm one tab's independent cached loaders concurrently.
+
+    Called at the top of a tab's fragment with only that tab's loaders, so
+    their warehouse round-trips overlap instead of running one after
+    another; the tab's own calls below are then cache hits.
+    """
+    for _ in iter_loaded_groups([loaders]):
+        pass
+
+
 # -----------------------------
 # Reusable Query Helpers
 # -----------------------------
 
 
+@st.cache_data(ttl=SLOW_TTL, show_spinner=False)
 def get_global_kpis() -> Dict[str, Any]:
     """
     Calculate firm-level KPIs including client count, advisor count, AUM, and YTD growth.
@@ -199,45 +727,15 @@ def get_global_kpis() -> Dict[str, Any]:
         - aum: Assets under management (latest snapshot)
         - ytd_growth_pct: Year-to-date growth percentage
     """
-    # Clients
-    clients_df = run_query("SELECT COUNT(DISTINCT CLIENT_ID) AS CNT FROM CLIENTS")
-    num_clients = (
-        int(clients_df.loc[0, "CNT"])
-        if not clients_df.empty and "CNT" in clients_df.columns
-        else 0
-    )
-
-    # Advisors
-    advisors_df = run_query("SELECT COUNT(DISTINCT ADVISOR_ID) AS CNT FROM ADVISORS")
-    num_advisors = (
-        int(advisors_df.loc[0, "CNT"])
-        if not advisors_df.empty and "CNT" in advisors_df.columns
-        else 0
-    )
-
-    # AUM (latest non-cash market value across all portfolios)
-    aum_sql = """
-        WITH latest AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY PORTFOLIO_ID
-        )
-        SELECT COALESCE(SUM(ph.MARKET_VALUE), 0) AS AUM
-        FROM POSITION_HISTORY ph
-        JOIN latest lt
-          ON ph.PORTFOLIO_ID = lt.PORTFOLIO_ID AND ph.TIMESTAMP = lt.MAX_TS
-        WHERE ph.TICKER <> 'CASH'
-    """
-    aum_df = run_query(aum_sql)
-    aum = (
-        float(aum_df.loc[0, "AUM"])
-        if not aum_df.empty and "AUM" in aum_df.columns
-        else 0.0
-    )
-
-    # YTD growth (verified query style)
-    ytd_sql = """
-        WITH port AS (
+    # Single round-trip: headcounts as scalar subqueries (HLL estimates are
+    # fine for headline tiles), AUM from the latest snapshot, and YTD growth
+    # via the verified ASOF JOIN query style
+    kpi_sql = """
+        WITH aum AS (
+            SELECT COALESCE(SUM(MARKET_VALUE), 0) AS AUM
+            FROM LATEST_NONCASH_POSITIONS
+        ),
+        port AS (
             SELECT p.PORTFOLIO_ID,
                    TO_TIMESTAMP(DATE_TRUNC('YEAR', CURRENT_DATE)) AS START_OF_YEAR,
                    TO_TIMESTAMP(CURRENT_DATE) AS END_DATE
@@ -264,26 +762,27 @@ def get_global_kpis() -> Dict[str, Any]:
             MATCH_CONDITION (p.END_DATE >= pv.TIMESTAMP)
             ON p.PORTFOLIO_ID = pv.PORTFOLIO_ID
             GROUP BY 1,2
+        ),
+        ytd AS (
+            SELECT (l.TOT_MARKET_VALUE - s.TOT_MARKET_VALUE)
+                   / NULLIF(s.TOT_MARKET_VALUE, 0) AS YTD_GROWTH_PCT
+            FROM latest_value AS l
+            JOIN start_of_year_value AS s ON (l.JOIN_ID = s.JOIN_ID)
         )
-        SELECT (l.TOT_MARKET_VALUE - s.TOT_MARKET_VALUE)
-               / NULLIF(NULLIF(s.TOT_MARKET_VALUE, 0), 0) AS YTD_GROWTH_PCT
-        FROM latest_value AS l
-        JOIN start_of_year_value AS s ON (l.JOIN_ID = s.JOIN_ID)
-    """
-    ytd_df = run_query(ytd_sql)
-    ytd_growth_pct = (
-        float(ytd_df.loc[0, "YTD_GROWTH_PCT"])
-        if not ytd_df.empty
-        and "YTD_GROWTH_PCT" in ytd_df.columns
-        and pd.notna(ytd_df.loc[0, "YTD_GROWTH_PCT"])
-        else None
-    )
-
+        SELECT (SELECT APPROX_COUNT_DISTINCT(CLIENT_ID) FROM CLIENTS) AS NUM_CLIENTS,
+               (SELECT APPROX_COUNT_DISTINCT(ADVISOR_ID) FROM ADVISORS) AS NUM_ADVISORS,
+               a.AUM,
+               (SELECT YTD_GROWTH_PCT FROM ytd) AS YTD_GROWTH_PCT
+        FROM aum a
+    """
+    # Scalar subqueries always yield one row, so an empty dict is a failure
+    row = _require_rows(run_row(kpi_sql), "Firm KPI query")
+    ytd = row.get("YTD_GROWTH_PCT")
     return {
-        "num_clients": num_clients,
-        "num_advisors": num_advisors,
-        "aum": aum,
-        "ytd_growth_pct": ytd_growth_pct,
+        "num_clients": int(row.get("NUM_CLIENTS") or 0),
+        "num_advisors": int(row.get("NUM_ADVISORS") or 0),
+        "aum": float(row.get("AUM") or 0.0),
+        "ytd_growth_pct": float(ytd) if ytd is not None else None,
     }
 
 
@@ -300,7 +799,7 @@ def get_hnw_low_engagement(
     Returns:
         DataFrame with client details and last interaction dates
     """
-    sql = f"""
+    sql = """
         WITH last_interaction AS (
             SELECT i.CLIENT_ID, MAX(i.TIMESTAMP) AS LAST_INTERACTION_DATE
             FROM INTERACTIONS AS i
@@ -310,26 +809,19 @@ def get_hnw_low_engagement(
                li.LAST_INTERACTION_DATE
         FROM CLIENTS AS c
         LEFT OUTER JOIN last_interaction AS li ON c.CLIENT_ID = li.CLIENT_ID
-        WHERE c.NET_WORTH_ESTIMATE > {net_worth_threshold}
-          AND (li.LAST_INTERACTION_DATE IS NULL OR li.LAST_INTERACTION_DATE < DATEADD(DAY, -{threshold_days}, CURRENT_DATE))
+        WHERE c.NET_WORTH_ESTIMATE > ?
+          AND (li.LAST_INTERACTION_DATE IS NULL OR li.LAST_INTERACTION_DATE < DATEADD(DAY, -?, CURRENT_DATE))
         ORDER BY c.NET_WORTH_ESTIMATE DESC NULLS LAST
     """
-    return run_query(sql)
+    return run_query(sql, params=(net_worth_threshold, threshold_days))
 
 
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
 def get_advisor_productivity(window_days: int = 90) -> pd.DataFrame:
-    sql = f"""
-        WITH latest AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY PORTFOLIO_ID
-        ),
-        portfolio_aum AS (
-            SELECT ph.PORTFOLIO_ID, SUM(ph.MARKET_VALUE) AS PORTFOLIO_AUM
-            FROM POSITION_HISTORY ph
-            JOIN latest lt
-              ON ph.PORTFOLIO_ID = lt.PORTFOLIO_ID AND ph.TIMESTAMP = lt.MAX_TS
-            WHERE ph.TICKER <> 'CASH'
+    sql = """
+        WITH portfolio_aum AS (
+            SELECT PORTFOLIO_ID, SUM(MARKET_VALUE) AS PORTFOLIO_AUM
+            FROM LATEST_NONCASH_POSITIONS
             GROUP BY 1
         ),
         advisor_clients AS (
@@ -345,7 +837,7 @@ def get_advisor_productivity(window_days: int = 90) -> pd.DataFrame:
         recent_interactions AS (
             SELECT i.ADVISOR_ID, COUNT(*) AS INTERACTIONS_90D
             FROM INTERACTIONS i
-            WHERE i.TIMESTAMP >= DATEADD(DAY, -{window_days}, CURRENT_DATE)
+            WHERE i.TIMESTAMP >= DATEADD(DAY, -?, CURRENT_DATE)
             GROUP BY 1
         )
         SELECT ap.ADVISOR_ID,
@@ -362,27 +854,102 @@ def get_advisor_productivity(window_days: int = 90) -> pd.DataFrame:
         GROUP BY ap.ADVISOR_ID, adv.NAME, ri.INTERACTIONS_90D
         ORDER BY TOTAL_AUM DESC
     """
-    return run_query(sql)
+    return run_query(sql, params=(window_days,), persist=True)
 
 
-def get_asset_allocation_latest() -> pd.DataFrame:
-    sql = """
-        WITH latest AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY PORTFOLIO_ID
+def get_portfolio_snapshots(
+    threshold_pct: float = 0.3, limit: Optional[int] = 500
+) -> Dict[str, pd.DataFrame]:
+    """
+    Asset allocation and concentration breaches from one latest-positions scan.
+
+    Both result sets are returned by a single statement as a UNION ALL tagged
+    with a KIND column and split apart in pandas.
+
+    Args:
+        threshold_pct: Minimum share of a portfolio for a position to breach
+        limit: Keep only the N largest breaches (None returns all)
+
+    Returns:
+        Dictionary with "allocation" and "concentration" DataFrames
+    """
+    top_n = (
+        "QUALIFY ROW_NUMBER() OVER (ORDER BY lp.MARKET_VALUE / NULLIF(t.TOTAL, 0) DESC) <= ?"
+        if limit
+        else ""
+    )
+    sql = f"""
+        WITH latest_positions AS (
+            SELECT PORTFOLIO_ID, TICKER, ASSET_CLASS, MARKET_VALUE
+            FROM LATEST_NONCASH_POSITIONS
+        ),
+        totals AS (
+            SELECT PORTFOLIO_ID, SUM(MARKET_VALUE) AS TOTAL
+            FROM latest_positions
+            GROUP BY 1
         )
-        SELECT ph.ASSET_CLASS, SUM(ph.MARKET_VALUE) AS TOTAL_VALUE
-        FROM POSITION_HISTORY ph
-        JOIN latest lt
-          ON ph.PORTFOLIO_ID = lt.PORTFOLIO_ID AND ph.TIMESTAMP = lt.MAX_TS
-        WHERE ph.TICKER <> 'CASH'
-        GROUP BY ph.ASSET_CLASS
-        ORDER BY TOTAL_VALUE DESC
+        SELECT 'allocation' AS KIND,
+               ASSET_CLASS AS DIM1,
+               NULL AS DIM2,
+               SUM(MARKET_VALUE) AS MARKET_VALUE,
+               NULL AS TOTAL,
+               NULL AS PCT_OF_PORTFOLIO
+        FROM latest_positions
+        GROUP BY ASSET_CLASS
+        UNION ALL
+        SELECT 'concentration' AS KIND,
+               lp.PORTFOLIO_ID,
+               lp.TICKER,
+               lp.MARKET_VALUE,
+               t.TOTAL,
+               lp.MARKET_VALUE / NULLIF(t.TOTAL, 0)
+        FROM latest_positions lp
+        JOIN totals t USING (PORTFOLIO_ID)
+        WHERE lp.MARKET_VALUE / NULLIF(t.TOTAL, 0) >= ?
+        {top_n}
     """
-    return run_query(sql)
+    params = (threshold_pct, limit) if limit else (threshold_pct,)
+    snapshots = run_query(sql, params=params)
+    if "KIND" not in snapshots.columns:
+        return {
+            "allocation": pd.DataFrame(columns=["ASSET_CLASS", "TOTAL_VALUE"]),
+            "concentration": pd.DataFrame(
+                columns=[
+                    "PORTFOLIO_ID",
+                    "TICKER",
+                    "MARKET_VALUE",
+                    "TOTAL",
+                    "PCT_OF_PORTFOLIO",
+                ]
+            ),
+        }
+
+    allocation = (
+        snapshots.loc[snapshots["KIND"] == "allocation", ["DIM1", "MARKET_VALUE"]]
+        .rename(columns={"DIM1": "ASSET_CLASS", "MARKET_VALUE": "TOTAL_VALUE"})
+        .sort_values("TOTAL_VALUE", ascending=False)
+        .reset_index(drop=True)
+    )
+    concentration = (
+        snapshots.loc[
+            snapshots["KIND"] == "concentration",
+            ["DIM1", "DIM2", "MARKET_VALUE", "TOTAL", "PCT_OF_PORTFOLIO"],
+        ]
+        .rename(columns={"DIM1": "PORTFOLIO_ID", "DIM2": "TICKER"})
+        .sort_values("PCT_OF_PORTFOLIO", ascending=False)
+        .reset_index(drop=True)
+    )
+    return {"allocation": allocation, "concentration": concentration}
+
+
+@st.cache_data(ttl=SLOW_TTL, show_spinner=False)
+def get_asset_allocation_latest() -> pd.DataFrame:
+    return _require_rows(
+        get_portfolio_snapshots()["allocation"], "Asset allocation query"
+    )
 
 
+@st.cache_data(ttl=SLOW_TTL, show_spinner=False)
 def get_market_events_impact() -> pd.DataFrame:
     sql = """
         WITH daily_portfolio_value AS (
@@ -417,161 +984,264 @@ def get_market_events_impact() -> pd.DataFrame:
         SELECT s.EVENT_ID, s.EVENT_NAME, s.START_DATE, e.END_DATE,
                s.START_AUM, e.END_AUM,
                (e.END_AUM - s.START_AUM) AS CHANGE_AUM,
-               (e.END_AUM - s.START_AUM) / NULLIF(NULLIF(s.START_AUM, 0), 0) AS CHANGE_PCT
+               (e.END_AUM - s.START_AUM) / NULLIF(s.START_AUM, 0) AS CHANGE_PCT
         FROM start_vals s
         JOIN end_vals e ON s.EVENT_ID = e.EVENT_ID
         ORDER BY s.START_DATE
     """
-    return run_query(sql)
+    return _require_rows(run_query(sql), "Market events query")
 
 
 def get_suitability_mismatches() -> pd.DataFrame:
+    # Suitability matrix is evaluated in Snowflake so only mismatches are returned
     sql = """
+        WITH allowed (RISK, STRAT) AS (
+            SELECT * FROM VALUES
+                ('Conservative', 'Conservative'),
+                ('Conservative', 'Balanced'),
+                ('Moderate', 'Balanced'),
+                ('Moderate', 'Moderate'),
+                ('Moderate', 'Growth'),
+                ('Balanced', 'Balanced'),
+                ('Balanced', 'Moderate'),
+                ('Balanced', 'Growth'),
+                ('Growth', 'Growth'),
+                ('Growth', 'Aggressive Growth'),
+                ('Aggressive Growth', 'Aggressive Growth')
+        )
         SELECT c.CLIENT_ID,
                c.FIRST_NAME,
                c.LAST_NAME,
                c.RISK_TOLERANCE,
                p.PORTFOLIO_ID,
-               p.STRATEGY_TYPE
+               p.STRATEGY_TYPE,
+               TRUE AS SUITABILITY_MISMATCH
         FROM CLIENTS c
         JOIN PORTFOLIOS p ON p.CLIENT_ID = c.CLIENT_ID
+        WHERE c.RISK_TOLERANCE IN (SELECT RISK FROM allowed)
+          AND NOT EXISTS (
+              SELECT 1 FROM allowed a
+              WHERE a.RISK = c.RISK_TOLERANCE
+                AND a.STRAT = COALESCE(p.STRATEGY_TYPE, '')
+          )
     """
-    df = run_query(sql)
-    if df.empty:
-        return df
+    return run_query(sql)
 
-    # Simple suitability matrix
-    allowed = {
-        "Conservative": {"Conservative", "Balanced"},
-        "Moderate": {"Balanced", "Moderate", "Growth"},
-        "Balanced": {"Balanced", "Moderate", "Growth"},
-        "Growth": {"Growth", "Aggressive Growth"},
-        "Aggressive Growth": {"Aggressive Growth"},
-    }
 
-    def is_mismatch(row) -> bool:
-        risk = row.get("RISK_TOLERANCE") or ""
-        strat = row.get("STRATEGY_TYPE") or ""
-        if risk not in allowed:
-            return False
-        return strat not in allowed[risk]
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def get_concentration_breaches(
+    threshold_pct: float = 0.3, limit: Optional[int] = 500
+) -> pd.DataFrame:
+    return get_portfolio_snapshots(threshold_pct, limit)["concentration"]
 
-    df["SUITABILITY_MISMATCH"] = df.apply(is_mismatch, axis=1)
-    return df[df["SUITABILITY_MISMATCH"]]
 
+def get_interactions_summary(window_days: int = 365) -> Dict[str, pd.DataFrame]:
+    """
+    Interaction counts by channel, by type, complaints per month and the
+    most active clients over the last ``window_days`` days.
 
-def get_concentration_breaches(threshold_pct: float = 0.3) -> pd.DataFrame:
-    sql = f"""
-        WITH latest AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY PORTFOLIO_ID
-        ),
-        latest_positions AS (
-            SELECT ph.PORTFOLIO_ID, ph.TICKER, ph.MARKET_VALUE
-            FROM POSITION_HISTORY ph
-            JOIN latest lt
-              ON ph.PORTFOLIO_ID = lt.PORTFOLIO_ID AND ph.TIMESTAMP = lt.MAX_TS
-            WHERE ph.TICKER <> 'CASH'
-        ),
-        totals AS (
-            SELECT PORTFOLIO_ID, SUM(MARKET_VALUE) AS TOTAL
-            FROM latest_positions
-            GROUP BY 1
+    All four come from one scan of the window, returned as a UNION ALL tagged
+    with a KIND column and split apart in pandas.
+    """
+    sql = """
+        WITH base AS (
+            SELECT CLIENT_ID, CHANNEL, INTERACTION_TYPE, TIMESTAMP
+            FROM INTERACTIONS
+            WHERE TIMESTAMP >= DATEADD(DAY, -?, CURRENT_DATE)
         )
-        SELECT lp.PORTFOLIO_ID, lp.TICKER,
-               lp.MARKET_VALUE,
-               t.TOTAL,
-               lp.MARKET_VALUE / NULLIF(NULLIF(t.TOTAL, 0), 0) AS PCT_OF_PORTFOLIO
-        FROM latest_positions lp
-        JOIN totals t USING (PORTFOLIO_ID)
-        WHERE lp.MARKET_VALUE / NULLIF(NULLIF(t.TOTAL, 0), 0) >= {threshold_pct}
-        ORDER BY PCT_OF_PORTFOLIO DESC
+        SELECT 'by_channel' AS KIND, CHANNEL AS LABEL, NULL AS MONTH, COUNT(*) AS CNT
+        FROM base
+        GROUP BY CHANNEL
+        UNION ALL
+        SELECT 'by_type', INTERACTION_TYPE, NULL, COUNT(*)
+        FROM base
+        GROUP BY INTERACTION_TYPE
+        UNION ALL
+        SELECT 'complaints', NULL, DATE_TRUNC('MONTH', TIMESTAMP), COUNT(*)
+        FROM base
+        WHERE INTERACTION_TYPE = 'Complaint'
+        GROUP BY DATE_TRUNC('MONTH', TIMESTAMP)
+        UNION ALL
+        SELECT 'top_clients', CLIENT_ID, NULL, COUNT(*)
+        FROM base
+        GROUP BY CLIENT_ID
+        QUALIFY ROW_NUMBER() OVER (ORDER BY COUNT(*) DESC) <= 20
     """
-    return run_query(sql)
+    parts = {
+        # kind: (key column, key name, count name, sort by count)
+        "by_channel": ("LABEL", "CHANNEL", "CNT", True),
+        "by_type": ("LABEL", "INTERACTION_TYPE", "CNT", True),
+        "complaints": ("MONTH", "MONTH", "COMPLAINTS", False),
+        "top_clients": ("LABEL", "CLIENT_ID", "INTERACTIONS", True),
+    }
+    summary = run_query(sql, params=(window_days,))
+    if "KIND" not in summary.columns:
+        return {
+            kind: pd.DataFrame(columns=[name, count])
+            for kind, (_, name, count, _) in parts.items()
+        }
+
+    results = {}
+    for kind, (column, name, count, by_count) in parts.items():
+        part = summary.loc[summary["KIND"] == kind, [column, "CNT"]].rename(
+            columns={column: name, "CNT": count}
+        )
+        results[kind] = part.sort_values(
+            count if by_count else name, ascending=not by_count
+        ).reset_index(drop=True)
+    return results
 
 
-def get_interactions_summary(window_days: int = 365) -> Dict[str, pd.DataFrame]:
-    by_channel = run_query(
-        f"""
-        SELECT CHANNEL, COUNT(*) AS CNT
-        FROM INTERACTIONS
-        WHERE TIMESTAMP >= DATEADD(DAY, -{window_days}, CURRENT_DATE)
-        GROUP BY 1
-        ORDER BY CNT DESC
-        """
+# -----------------------------
+# Advanced Use Case Functions
+# -----------------------------
+
+# Label buckets are applied in pandas as ordered Categoricals rather than as
+# SQL CASE ladders, so each label string is transferred and stored only once
+WEALTH_SEGMENT_BINS = [-np.inf, 250_000, 1_000_000, 5_000_000, 10_000_000, np.inf]
+WEALTH_SEGMENT_LABELS = [
+    "Emerging Wealth (<$250K)",
+    "Mass Affluent ($250K-1M)",
+    "Affluent ($1-5M)",
+    "High Net Worth ($5-10M)",
+    "Ultra High Net Worth (>$10M)",
+]
+PRIORITY_BINS = [-np.inf, 1_000_000, 5_000_000, np.inf]
+PRIORITY_LABELS = ["Low", "Medium", "High"]
+DRIFT_STATUS_BINS = [-np.inf, 5, 10, np.inf]
+DRIFT_STATUS_LABELS = ["Within Range", "Medium Drift", "High Drift"]
+MARKET_TIER_BINS = [-np.inf, 20_000_000, 50_000_000, np.inf]
+MARKET_TIER_LABELS = ["Emerging Market", "Medium Value Market", "High Value Market"]
+CASH_STATUS_BINS = [-np.inf, 0.05, 0.10, 0.15, np.inf]
+CASH_STATUS_LABELS = [
+    "Low Cash (<5%)",
+    "Normal Cash (5-10%)",
+    "Moderate Cash (10-15%)",
+    "High Cash (>15%)",
+]
+
+
+def _label_bins(
+    values: pd.Series, bins: list, labels: list, right: bool = True
+) -> pd.Series:
+    """
+    Bucket a numeric column into ordered Categorical labels.
+
+    Missing values fall into the lowest bucket, matching the ELSE branch of
+    the SQL CASE expressions these buckets replace.
+    """
+    return pd.cut(
+        values.fillna(0).astype("float64"), bins=bins, labels=labels, right=right
     )
-    by_type = run_query(
-        f"""
-        SELECT INTERACTION_TYPE, COUNT(*) AS CNT
-        FROM INTERACTIONS
-        WHERE TIMESTAMP >= DATEADD(DAY, -{window_days}, CURRENT_DATE)
-        GROUP BY 1
-        ORDER BY CNT DESC
-        """
+
+
+# Keyword rules for interaction notes, checked in order (first match wins)
+SENTIMENT_RULES = [
+    ("Positive", "satisfied|happy|pleased|excellent"),
+    ("Negative", "dissatisfied|unhappy|frustrated|angry|complaint"),
+    ("Neutral/Concerned", "concerned|worried|question|clarification"),
+]
+ISSUE_CATEGORY_RULES = [
+    ("Fees", "fee"),
+    ("Performance", "performance|return|loss"),
+    ("Service Quality", "service|response|wait"),
+    ("Advisor Relationship", "advisor|relationship"),
+]
+
+
+def _label_notes(notes: pd.Series, rules: list, default: str) -> pd.Series:
+    """
+    Tag free-text notes with the label of the first matching keyword rule.
+
+    Mirrors an ordered SQL CASE over case-insensitive substring patterns.
+    """
+    text = notes.astype("string")
+    conditions = [
+        text.str.contains(pattern, case=False, regex=True, na=False).to_numpy(bool)
+        for _, pattern in rules
+    ]
+    labels = [label for label, _ in rules]
+    return pd.Series(
+        np.select(conditions, labels, default=default), index=notes.index
     )
-    complaints = run_query(
-        f"""
-        SELECT DATE_TRUNC('MONTH', TIMESTAMP) AS MONTH, COUNT(*) AS COMPLAINTS
-        FROM INTERACTIONS
-        WHERE INTERACTION_TYPE = 'Complaint'
-          AND TIMESTAMP >= DATEADD(DAY, -{window_days}, CURRENT_DATE)
+
+
+# Latest non-cash AUM per client, shared by the segment queries below
+_CLIENT_SEGMENT_AUM_CTE = """
+    client_aum AS (
+        SELECT p.CLIENT_ID,
+               SUM(lnp.MARKET_VALUE) AS TOTAL_AUM,
+               COUNT(DISTINCT p.PORTFOLIO_ID) AS NUM_PORTFOLIOS
+        FROM PORTFOLIOS p
+        JOIN LATEST_NONCASH_POSITIONS lnp ON p.PORTFOLIO_ID = lnp.PORTFOLIO_ID
         GROUP BY 1
-        ORDER BY 1
-        """
     )
-    top_clients = run_query(
-        f"""
-        SELECT CLIENT_ID, COUNT(*) AS INTERACTIONS
-        FROM INTERACTIONS
-        WHERE TIMESTAMP >= DATEADD(DAY, -{window_days}, CURRENT_DATE)
+"""
+
+# Index into WEALTH_SEGMENT_LABELS, matching _label_bins(..., right=False);
+# clients without non-cash positions land in tier 0 like a NULL TOTAL_AUM
+_WEALTH_SEGMENT_TIER_SQL = " + ".join(
+    f"IFF(COALESCE(ca.TOTAL_AUM, 0) >= {edge}, 1, 0)"
+    for edge in WEALTH_SEGMENT_BINS[1:-1]
+)
+
+
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def get_wealth_segment_counts() -> pd.DataFrame:
+    """Client count per wealth segment, bucketed and counted in Snowflake"""
+
+    sql = f"""
+        WITH {_CLIENT_SEGMENT_AUM_CTE}
+        SELECT {_WEALTH_SEGMENT_TIER_SQL} AS TIER, COUNT(*) AS N
+        FROM CLIENTS c
+        LEFT JOIN client_aum ca ON c.CLIENT_ID = ca.CLIENT_ID
         GROUP BY 1
-        ORDER BY INTERACTIONS DESC
-        LIMIT 20
-        """
+    """
+    counts = run_query(sql)
+    if counts.empty:
+        return pd.DataFrame(columns=["WEALTH_SEGMENT", "N"])
+    counts["WEALTH_SEGMENT"] = pd.Categorical.from_codes(
+        counts["TIER"].astype(int), categories=WEALTH_SEGMENT_LABELS, ordered=True
     )
-    return {
-        "by_channel": by_channel,
-        "by_type": by_type,
-        "complaints": complaints,
-        "top_clients": top_clients,
-    }
+    return counts[["WEALTH_SEGMENT", "N"]].sort_values("WEALTH_SEGMENT")
 
 
-# -----------------------------
-# Advanced Use Case Functions
-# -----------------------------
+def _label_wealth_segments(segments: pd.DataFrame) -> pd.DataFrame:
+    if not segments.empty:
+        segments["WEALTH_SEGMENT"] = _label_bins(
+            segments["TOTAL_AUM"],
+            WEALTH_SEGMENT_BINS,
+            WEALTH_SEGMENT_LABELS,
+            right=False,
+        )
+    return segments
+
+
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def get_top_segments(limit: int = 20) -> pd.DataFrame:
+    """Top clients by AUM with their wealth segment"""
+
+    sql = f"""
+        WITH {_CLIENT_SEGMENT_AUM_CTE}
+        SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.RISK_TOLERANCE,
+               ca.TOTAL_AUM, ca.NUM_PORTFOLIOS,
+               c.NET_WORTH_ESTIMATE
+        FROM CLIENTS c
+        LEFT JOIN client_aum ca ON c.CLIENT_ID = ca.CLIENT_ID
+        ORDER BY ca.TOTAL_AUM DESC NULLS LAST
+        LIMIT ?
+    """
+    return _label_wealth_segments(run_query(sql, params=(limit,)))
 
 
 def get_customer_360_segments() -> Dict[str, pd.DataFrame]:
     """Customer 360 & Segmentation - Single view across balances, portfolios, behavior"""
 
     # Client segmentation by AUM
-    segments_sql = """
-        WITH latest_positions AS (
-            SELECT p.PORTFOLIO_ID, p.CLIENT_ID, MAX(ph.TIMESTAMP) AS MAX_TS
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            GROUP BY 1, 2
-        ),
-        client_aum AS (
-            SELECT lp.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_AUM,
-                   COUNT(DISTINCT lp.PORTFOLIO_ID) AS NUM_PORTFOLIOS
-            FROM latest_positions lp
-            JOIN POSITION_HISTORY ph ON lp.PORTFOLIO_ID = ph.PORTFOLIO_ID AND lp.MAX_TS = ph.TIMESTAMP
-            WHERE ph.TICKER <> 'CASH'
-            GROUP BY 1
-        )
+    segments_sql = f"""
+        WITH {_CLIENT_SEGMENT_AUM_CTE}
         SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.RISK_TOLERANCE,
                ca.TOTAL_AUM, ca.NUM_PORTFOLIOS,
-               CASE
-                   WHEN ca.TOTAL_AUM >= 10000000 THEN 'Ultra High Net Worth (>$10M)'
-                   WHEN ca.TOTAL_AUM >= 5000000 THEN 'High Net Worth ($5-10M)'
-                   WHEN ca.TOTAL_AUM >= 1000000 THEN 'Affluent ($1-5M)'
-                   WHEN ca.TOTAL_AUM >= 250000 THEN 'Mass Affluent ($250K-1M)'
-                   ELSE 'Emerging Wealth (<$250K)'
-               END AS WEALTH_SEGMENT,
                c.NET_WORTH_ESTIMATE
         FROM CLIENTS c
         LEFT JOIN client_aum ca ON c.CLIENT_ID = ca.CLIENT_ID
@@ -593,53 +1263,139 @@ def get_customer_360_segments() -> Dict[str, pd.DataFrame]:
     """
 
     return {
-        "segments": run_query(segments_sql),
+        "segments": _label_wealth_segments(run_query(segments_sql)),
         "engagement": run_query(engagement_sql),
     }
 
 
-def get_next_best_actions() -> pd.DataFrame:
+NBA_ACTION_LABELS = [
+    "Portfolio Setup - Start Investment Journey",
+    "Diversification - Add Second Portfolio",
+    "Tax Optimization - Municipal Bonds",
+    "Alternative Investments - REITs/Commodities",
+    "Re-engagement - Portfolio Review Meeting",
+    "Wealth Planning - Estate & Trust Services",
+    "Relationship Deepening - Financial Planning Session",
+]
+RISK_TOLERANCE_CODES = [
+    "Conservative",
+    "Moderate",
+    "Balanced",
+    "Growth",
+    "Aggressive Growth",
+]
+
+
+def _score_next_best_actions(
+    aum: np.ndarray, n_port: np.ndarray, days: np.ndarray, risk_code: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rule ladder for next best actions over per-client feature arrays.
+
+    Returns action codes (index into NBA_ACTION_LABELS) and priority codes
+    (index into PRIORITY_LABELS). NaN AUM / days compare False, matching
+    NULL semantics of the original SQL CASE.
+    """
+    n = aum.shape[0]
+    action = np.empty(n, dtype=np.int8)
+    priority = np.empty(n, dtype=np.int8)
+    for i in range(n):
+        if n_port[i] == 0:
+            action[i] = 0
+        elif n_port[i] == 1 and aum[i] > 500_000:
+            action[i] = 1
+        elif risk_code[i] == 0 and aum[i] > 1_000_000:
+            action[i] = 2
+        elif (risk_code[i] == 3 or risk_code[i] == 4) and n_port[i] < 3:
+            action[i] = 3
+        elif days[i] > 180:
+            action[i] = 4
+        elif aum[i] > 2_000_000:
+            action[i] = 5
+        else:
+            action[i] = 6
+
+        if aum[i] > 5_000_000:
+            priority[i] = 2
+        elif aum[i] > 1_000_000:
+            priority[i] = 1
+        else:
+            priority[i] = 0
+    return action, priority
+
+
+if njit is not None:
+    _score_next_best_actions = njit(cache=True)(_score_next_best_actions)
+
+
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def get_next_best_actions(limit: int = 50) -> pd.DataFrame:
     """Next Best Action - Cross/upsell recommendations based on behavior patterns"""
 
     sql = """
-        WITH client_profile AS (
-            SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.RISK_TOLERANCE,
-                   COUNT(DISTINCT p.PORTFOLIO_ID) AS NUM_PORTFOLIOS,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_AUM,
-                   MAX(i.TIMESTAMP) AS LAST_INTERACTION
-            FROM CLIENTS c
-            LEFT JOIN PORTFOLIOS p ON c.CLIENT_ID = p.CLIENT_ID
-            LEFT JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            LEFT JOIN INTERACTIONS i ON c.CLIENT_ID = i.CLIENT_ID
-            WHERE ph.TICKER <> 'CASH' OR ph.TICKER IS NULL
-            GROUP BY 1, 2, 3, 4
-        ),
-        recommendations AS (
-            SELECT CLIENT_ID, FIRST_NAME, LAST_NAME, RISK_TOLERANCE, TOTAL_AUM,
-                   CASE
-                       WHEN NUM_PORTFOLIOS = 0 THEN 'Portfolio Setup - Start Investment Journey'
-                       WHEN NUM_PORTFOLIOS = 1 AND TOTAL_AUM > 500000 THEN 'Diversification - Add Second Portfolio'
-                       WHEN RISK_TOLERANCE = 'Conservative' AND TOTAL_AUM > 1000000 THEN 'Tax Optimization - Municipal Bonds'
-                       WHEN RISK_TOLERANCE IN ('Growth', 'Aggressive Growth') AND NUM_PORTFOLIOS < 3 THEN 'Alternative Investments - REITs/Commodities'
-                       WHEN DATEDIFF(DAY, LAST_INTERACTION, CURRENT_DATE) > 180 THEN 'Re-engagement - Portfolio Review Meeting'
-                       WHEN TOTAL_AUM > 2000000 THEN 'Wealth Planning - Estate & Trust Services'
-                       ELSE 'Relationship Deepening - Financial Planning Session'
-                   END AS RECOMMENDED_ACTION,
-                   CASE
-                       WHEN TOTAL_AUM > 5000000 THEN 'High'
-                       WHEN TOTAL_AUM > 1000000 THEN 'Medium'
-                       ELSE 'Low'
-                   END AS PRIORITY,
-                   ROUND(TOTAL_AUM * 0.02, 0) AS ESTIMATED_REVENUE_IMPACT
-            FROM client_profile
-        )
-        SELECT * FROM recommendations
-        ORDER BY
-            CASE PRIORITY WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END,
-            TOTAL_AUM DESC
-        LIMIT 50
+        SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.RISK_TOLERANCE,
+               SUM(ph.MARKET_VALUE) AS TOTAL_AUM,
+               COUNT(DISTINCT p.PORTFOLIO_ID) AS NUM_PORTFOLIOS,
+               DATEDIFF(DAY, MAX(i.TIMESTAMP), CURRENT_DATE) AS DAYS_SINCE_LAST_INTERACTION
+        FROM CLIENTS c
+        LEFT JOIN PORTFOLIOS p ON c.CLIENT_ID = p.CLIENT_ID
+        LEFT JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
+        LEFT JOIN INTERACTIONS i ON c.CLIENT_ID = i.CLIENT_ID
+        WHERE ph.TICKER <> 'CASH' OR ph.TICKER IS NULL
+        GROUP BY 1, 2, 3, 4
+        -- Priority is monotonic in AUM, so this matches High > Medium > Low ordering
+        ORDER BY TOTAL_AUM DESC NULLS LAST
+        LIMIT ?
     """
-    return run_query(sql)
+    df = run_query(sql, params=(limit,))
+    if df.empty:
+        return df
+
+    # Score raw features locally so the rules can change without a round-trip
+    aum = df["TOTAL_AUM"].to_numpy(dtype="float64", na_value=np.nan)
+    risk_code = pd.Categorical(
+        df["RISK_TOLERANCE"].astype(object), categories=RISK_TOLERANCE_CODES
+    ).codes.astype(np.int8)
+    action, priority = _score_next_best_actions(
+        aum,
+        df["NUM_PORTFOLIOS"].to_numpy(dtype="int64"),
+        df["DAYS_SINCE_LAST_INTERACTION"].to_numpy(dtype="float64", na_value=np.nan),
+        risk_code,
+    )
+
+    df["RECOMMENDED_ACTION"] = np.take(NBA_ACTION_LABELS, action)
+    df["PRIORITY"] = pd.Categorical.from_codes(
+        priority, categories=PRIORITY_LABELS, ordered=True
+    )
+    df["ESTIMATED_REVENUE_IMPACT"] = np.round(aum * 0.02, 0)
+    return df[
+        [
+            "CLIENT_ID",
+            "FIRST_NAME",
+            "LAST_NAME",
+            "RISK_TOLERANCE",
+            "TOTAL_AUM",
+            "RECOMMENDED_ACTION",
+            "PRIORITY",
+            "ESTIMATED_REVENUE_IMPACT",
+        ]
+    ]
+
+
+def get_next_best_actions_summary() -> Dict[str, int]:
+    """Recommendation count per priority, for the tab's metric tiles."""
+    df = get_next_best_actions()
+    if df.empty:
+        return {label: 0 for label in PRIORITY_LABELS}
+    counts = df["PRIORITY"].value_counts()
+    return {label: int(counts.get(label, 0)) for label in PRIORITY_LABELS}
+
+
+def get_next_best_actions_top(n: int = 15) -> pd.DataFrame:
+    """The ``n`` recommendations with the highest estimated revenue impact."""
+    # Impact is a fixed share of AUM and the query is already ordered by AUM,
+    # so the leading rows of the cached frame are the top ``n``
+    return get_next_best_actions().head(n)
 
 
 def get_churn_early_warning() -> pd.DataFrame:
@@ -647,65 +1403,66 @@ def get_churn_early_warning() -> pd.DataFrame:
 
     sql = """
         WITH balance_trends AS (
-            SELECT p.CLIENT_ID, p.PORTFOLIO_ID,
-                   SUM(CASE WHEN ph.TIMESTAMP >= DATEADD(DAY, -30, CURRENT_DATE) THEN ph.MARKET_VALUE ELSE 0 END) AS RECENT_BALANCE,
-                   SUM(CASE WHEN ph.TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE) AND ph.TIMESTAMP < DATEADD(DAY, -30, CURRENT_DATE) THEN ph.MARKET_VALUE ELSE 0 END) AS PRIOR_BALANCE
+            SELECT p.CLIENT_ID,
+                   SUM(IFF(ph.TIMESTAMP >= DATEADD(DAY, -30, CURRENT_DATE), ph.MARKET_VALUE, 0)) AS RECENT_BALANCE,
+                   SUM(IFF(ph.TIMESTAMP < DATEADD(DAY, -30, CURRENT_DATE), ph.MARKET_VALUE, 0)) AS PRIOR_BALANCE
             FROM PORTFOLIOS p
             JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
             WHERE ph.TICKER <> 'CASH'
-            GROUP BY 1, 2
+              AND ph.TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE)
+            GROUP BY 1
         ),
         engagement_drop AS (
             SELECT CLIENT_ID,
-                   COUNT(CASE WHEN TIMESTAMP >= DATEADD(DAY, -30, CURRENT_DATE) THEN 1 END) AS RECENT_INTERACTIONS,
-                   COUNT(CASE WHEN TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE) AND TIMESTAMP < DATEADD(DAY, -30, CURRENT_DATE) THEN 1 END) AS PRIOR_INTERACTIONS
+                   COUNT_IF(TIMESTAMP >= DATEADD(DAY, -30, CURRENT_DATE)) AS RECENT_INTERACTIONS,
+                   COUNT_IF(TIMESTAMP < DATEADD(DAY, -30, CURRENT_DATE)) AS PRIOR_INTERACTIONS
             FROM INTERACTIONS
+            WHERE TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE)
             GROUP BY 1
+        ),
+        scored AS (
+            SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME,
+                   bt.RECENT_BALANCE,
+                   bt.PRIOR_BALANCE,
+                   ROUND((bt.RECENT_BALANCE - bt.PRIOR_BALANCE) / bt.PRIOR_BALANCE * 100, 2) AS BALANCE_CHANGE_PCT,
+                   COALESCE(ed.RECENT_INTERACTIONS, 0) AS RECENT_INTERACTIONS,
+                   COALESCE(ed.PRIOR_INTERACTIONS, 0) AS PRIOR_INTERACTIONS,
+                   CASE
+                       WHEN bt.RECENT_BALANCE < bt.PRIOR_BALANCE * 0.8 AND ed.RECENT_INTERACTIONS < ed.PRIOR_INTERACTIONS * 0.5 THEN 'High Risk'
+                       WHEN bt.RECENT_BALANCE < bt.PRIOR_BALANCE * 0.9 OR ed.RECENT_INTERACTIONS < ed.PRIOR_INTERACTIONS * 0.7 THEN 'Medium Risk'
+                       ELSE 'Low Risk'
+                   END AS CHURN_RISK
+            FROM CLIENTS c
+            JOIN balance_trends bt ON c.CLIENT_ID = bt.CLIENT_ID
+            LEFT JOIN engagement_drop ed ON c.CLIENT_ID = ed.CLIENT_ID
+            -- Filter on the per-client aggregates, not inside the aggregation
+            WHERE bt.PRIOR_BALANCE > 0
         )
-        SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME,
-               SUM(bt.RECENT_BALANCE) AS RECENT_BALANCE,
-               SUM(bt.PRIOR_BALANCE) AS PRIOR_BALANCE,
-               CASE
-                   WHEN SUM(bt.PRIOR_BALANCE) > 0
-                   THEN ROUND((SUM(bt.RECENT_BALANCE) - SUM(bt.PRIOR_BALANCE)) / SUM(bt.PRIOR_BALANCE) * 100, 2)
-                   ELSE 0
-               END AS BALANCE_CHANGE_PCT,
-               ed.RECENT_INTERACTIONS,
-               ed.PRIOR_INTERACTIONS,
-               CASE
-                   WHEN SUM(bt.RECENT_BALANCE) < SUM(bt.PRIOR_BALANCE) * 0.8 AND ed.RECENT_INTERACTIONS < ed.PRIOR_INTERACTIONS * 0.5 THEN 'High Risk'
-                   WHEN SUM(bt.RECENT_BALANCE) < SUM(bt.PRIOR_BALANCE) * 0.9 OR ed.RECENT_INTERACTIONS < ed.PRIOR_INTERACTIONS * 0.7 THEN 'Medium Risk'
-                   ELSE 'Low Risk'
-               END AS CHURN_RISK
-        FROM CLIENTS c
-        LEFT JOIN balance_trends bt ON c.CLIENT_ID = bt.CLIENT_ID
-        LEFT JOIN engagement_drop ed ON c.CLIENT_ID = ed.CLIENT_ID
-        WHERE SUM(bt.PRIOR_BALANCE) > 0
-        GROUP BY 1, 2, 3, ed.RECENT_INTERACTIONS, ed.PRIOR_INTERACTIONS
-        HAVING CHURN_RISK IN ('High Risk', 'Medium Risk')
+        SELECT *
+        FROM scored
+        WHERE CHURN_RISK IN ('High Risk', 'Medium Risk')
         ORDER BY BALANCE_CHANGE_PCT ASC
     """
-    return run_query(sql)
+    return run_query(sql, persist=True)
 
 
-def get_portfolio_drift_analysis() -> pd.DataFrame:
+def get_portfolio_drift_analysis(limit: Optional[int] = 500) -> pd.DataFrame:
     """Portfolio Drift & Rebalance - Asset-class drift vs strategy analysis"""
 
-    sql = """
-        WITH latest_positions AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY 1
-        ),
-        current_allocation AS (
+    # Only the N largest drifts are fetched unless the caller asks for all
+    top_n = (
+        "QUALIFY ROW_NUMBER() OVER (ORDER BY ABS(DRIFT_PCT) DESC) <= ?"
+        if limit
+        else ""
+    )
+    sql = f"""
+        WITH current_allocation AS (
             SELECT p.PORTFOLIO_ID, p.STRATEGY_TYPE,
-                   ph.ASSET_CLASS,
-                   SUM(ph.MARKET_VALUE) AS CURRENT_VALUE,
-                   SUM(SUM(ph.MARKET_VALUE)) OVER (PARTITION BY p.PORTFOLIO_ID) AS TOTAL_PORTFOLIO_VALUE
+                   lnp.ASSET_CLASS,
+                   SUM(lnp.MARKET_VALUE) AS CURRENT_VALUE,
+                   SUM(SUM(lnp.MARKET_VALUE)) OVER (PARTITION BY p.PORTFOLIO_ID) AS TOTAL_PORTFOLIO_VALUE
             FROM PORTFOLIOS p
-            JOIN latest_positions lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID AND lp.MAX_TS = ph.TIMESTAMP
-            WHERE ph.TICKER <> 'CASH'
+            JOIN LATEST_NONCASH_POSITIONS lnp ON p.PORTFOLIO_ID = lnp.PORTFOLIO_ID
             GROUP BY 1, 2, 3
         ),
         target_allocations AS (
@@ -726,35 +1483,37 @@ def get_portfolio_drift_analysis() -> pd.DataFrame:
                ROUND(ca.CURRENT_VALUE / ca.TOTAL_PORTFOLIO_VALUE * 100, 2) AS CURRENT_PCT,
                ta.TARGET_PCT,
                ROUND(ca.CURRENT_VALUE / ca.TOTAL_PORTFOLIO_VALUE * 100 - ta.TARGET_PCT, 2) AS DRIFT_PCT,
-               CASE
-                   WHEN ABS(ca.CURRENT_VALUE / ca.TOTAL_PORTFOLIO_VALUE * 100 - ta.TARGET_PCT) > 10 THEN 'High Drift'
-                   WHEN ABS(ca.CURRENT_VALUE / ca.TOTAL_PORTFOLIO_VALUE * 100 - ta.TARGET_PCT) > 5 THEN 'Medium Drift'
-                   ELSE 'Within Range'
-               END AS DRIFT_STATUS,
                ca.TOTAL_PORTFOLIO_VALUE
         FROM current_allocation ca
         LEFT JOIN target_allocations ta ON ca.STRATEGY_TYPE = ta.STRATEGY_TYPE AND ca.ASSET_CLASS = ta.ASSET_CLASS
         WHERE ta.TARGET_PCT IS NOT NULL
+        {top_n}
         ORDER BY ABS(DRIFT_PCT) DESC
     """
-    return run_query(sql)
+    df = run_query(sql, params=(limit,) if limit else (), persist=True)
+    if not df.empty:
+        df["DRIFT_STATUS"] = _label_bins(
+            df["DRIFT_PCT"].abs(), DRIFT_STATUS_BINS, DRIFT_STATUS_LABELS
+        )
+    return df
 
 
-def get_idle_cash_analysis() -> pd.DataFrame:
+def get_idle_cash_analysis(limit: Optional[int] = 500) -> pd.DataFrame:
     """Idle Cash / Cash-Sweep - Identify opportunities to monetize idle balances"""
 
-    sql = """
-        WITH latest_positions AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY 1
-        ),
-        cash_analysis AS (
+    # Only the N largest cash balances are fetched unless the caller asks for all
+    top_n = (
+        "QUALIFY ROW_NUMBER() OVER (ORDER BY ca.CASH_BALANCE DESC) <= ?"
+        if limit
+        else ""
+    )
+    sql = f"""
+        WITH cash_analysis AS (
             SELECT p.PORTFOLIO_ID, p.CLIENT_ID, p.STRATEGY_TYPE,
                    SUM(CASE WHEN ph.TICKER = 'CASH' THEN ph.MARKET_VALUE ELSE 0 END) AS CASH_BALANCE,
                    SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
             FROM PORTFOLIOS p
-            JOIN latest_positions lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
+            JOIN LATEST_POSITION_TS lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
             JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID AND lp.MAX_TS = ph.TIMESTAMP
             GROUP BY 1, 2, 3
         )
@@ -763,12 +1522,6 @@ def get_idle_cash_analysis() -> pd.DataFrame:
                ca.CASH_BALANCE,
                ca.TOTAL_PORTFOLIO_VALUE,
                ROUND(ca.CASH_BALANCE / NULLIF(ca.TOTAL_PORTFOLIO_VALUE, 0) * 100, 2) AS CASH_PCT,
-               CASE
-                   WHEN ca.CASH_BALANCE / NULLIF(ca.TOTAL_PORTFOLIO_VALUE, 0) > 0.15 THEN 'High Cash (>15%)'
-                   WHEN ca.CASH_BALANCE / NULLIF(ca.TOTAL_PORTFOLIO_VALUE, 0) > 0.10 THEN 'Moderate Cash (10-15%)'
-                   WHEN ca.CASH_BALANCE / NULLIF(ca.TOTAL_PORTFOLIO_VALUE, 0) > 0.05 THEN 'Normal Cash (5-10%)'
-                   ELSE 'Low Cash (<5%)'
-               END AS CASH_STATUS,
                ROUND(ca.CASH_BALANCE * 0.03, 0) AS POTENTIAL_ANNUAL_NII,
                CASE
                    WHEN ca.CASH_BALANCE > 100000 AND ca.CASH_BALANCE / NULLIF(ca.TOTAL_PORTFOLIO_VALUE, 0) > 0.10 THEN 'Investment Opportunity'
@@ -778,62 +1531,118 @@ def get_idle_cash_analysis() -> pd.DataFrame:
         FROM cash_analysis ca
         JOIN CLIENTS c ON ca.CLIENT_ID = c.CLIENT_ID
         WHERE ca.CASH_BALANCE > 0
+        {top_n}
         ORDER BY ca.CASH_BALANCE DESC
     """
-    return run_query(sql)
+    df = run_query(sql, params=(limit,) if limit else ())
+    if not df.empty:
+        cash_ratio = df["CASH_BALANCE"] / df["TOTAL_PORTFOLIO_VALUE"].replace(0, np.nan)
+        df["CASH_STATUS"] = _label_bins(
+            cash_ratio, CASH_STATUS_BINS, CASH_STATUS_LABELS
+        )
+    return df
+
+
+def _score_anomalies(
+    amounts: np.ndarray, avg: np.ndarray, stddev: np.ndarray
+) -> np.ndarray:
+    """
+    Z-score of each transaction amount against its transaction type.
+
+    NaN where the type has no spread (missing or zero stddev).
+    """
+    n = amounts.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for i in prange(n):
+        if stddev[i] > 0:
+            out[i] = (amounts[i] - avg[i]) / stddev[i]
+        else:
+            out[i] = np.nan
+    return out
+
 
+if njit is not None:
+    # No fastmath: missing stats arrive as NaN and must compare False
+    _score_anomalies = njit(parallel=True, cache=True)(_score_anomalies)
 
+
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_trade_fee_anomalies() -> pd.DataFrame:
     """Trade & Transaction Anomaly Detection - Catch unusual patterns and outliers"""
 
     sql = """
         WITH transaction_stats AS (
-            SELECT TRANSACTION_TYPE,
-                   AVG(TOTAL_AMOUNT) AS AVG_AMOUNT,
-                   STDDEV(TOTAL_AMOUNT) AS STDDEV_AMOUNT,
-                   COUNT(*) AS TRANSACTION_COUNT,
-                   PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY TOTAL_AMOUNT) AS P95_AMOUNT
-            FROM TRANSACTIONS
-            WHERE TOTAL_AMOUNT > 0
-            GROUP BY 1
+            -- Full-history stats are precomputed; see sql/performance_objects.sql
+            SELECT ms.TRANSACTION_TYPE, ms.AVG_AMOUNT, ms.STDDEV_AMOUNT,
+                   ms.TRANSACTION_COUNT, tp.P95_AMOUNT
+            FROM MV_TRANSACTION_STATS ms
+            LEFT JOIN TRANSACTION_P95 tp ON ms.TRANSACTION_TYPE = tp.TRANSACTION_TYPE
         ),
         portfolio_clients AS (
             SELECT p.PORTFOLIO_ID, p.CLIENT_ID
             FROM PORTFOLIOS p
         ),
         anomalies AS (
+            -- Each rule is evaluated once as a boolean flag; only AVG_AMOUNT
+            -- and STDDEV_AMOUNT are carried forward, for the z-score
             SELECT t.TRANSACTION_ID, pc.CLIENT_ID, t.PORTFOLIO_ID,
                    t.TRANSACTION_TYPE, t.TOTAL_AMOUNT, t.QUANTITY, t.PRICE,
                    t.TIMESTAMP, t.TICKER,
-                   ts.AVG_AMOUNT, ts.STDDEV_AMOUNT, ts.P95_AMOUNT,
-                   CASE
-                       WHEN t.TOTAL_AMOUNT > ts.P95_AMOUNT * 2 THEN 'Unusually Large Transaction'
-                       WHEN t.TOTAL_AMOUNT > ts.AVG_AMOUNT + 3 * ts.STDDEV_AMOUNT THEN 'Statistical Outlier - High Value'
-                       WHEN t.PRICE = 0 AND t.TOTAL_AMOUNT > 0 THEN 'Zero Price with Value'
-                       WHEN t.QUANTITY = 0 AND t.TOTAL_AMOUNT > 0 THEN 'Zero Quantity with Value'
-                       WHEN t.TOTAL_AMOUNT > 1000000 AND t.TRANSACTION_TYPE = 'Buy' THEN 'Large Buy Transaction'
-                       WHEN ABS(t.TOTAL_AMOUNT - (t.QUANTITY * t.PRICE)) > t.TOTAL_AMOUNT * 0.05 THEN 'Price-Quantity Mismatch'
-                       ELSE 'Normal'
-                   END AS ANOMALY_TYPE
+                   ts.AVG_AMOUNT, ts.STDDEV_AMOUNT,
+                   t.TOTAL_AMOUNT > ts.P95_AMOUNT * 2 AS F_LARGE,
+                   t.TOTAL_AMOUNT > ts.AVG_AMOUNT + 3 * ts.STDDEV_AMOUNT AS F_OUTLIER,
+                   t.PRICE = 0 AND t.TOTAL_AMOUNT > 0 AS F_ZERO_PRICE,
+                   t.QUANTITY = 0 AND t.TOTAL_AMOUNT > 0 AS F_ZERO_QUANTITY,
+                   t.TOTAL_AMOUNT > 1000000 AND t.TRANSACTION_TYPE = 'Buy' AS F_LARGE_BUY,
+                   ABS(t.TOTAL_AMOUNT - (t.QUANTITY * t.PRICE)) > t.TOTAL_AMOUNT * 0.05 AS F_MISMATCH
             FROM TRANSACTIONS t
             LEFT JOIN transaction_stats ts ON t.TRANSACTION_TYPE = ts.TRANSACTION_TYPE
             LEFT JOIN portfolio_clients pc ON t.PORTFOLIO_ID = pc.PORTFOLIO_ID
             WHERE t.TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE)
+        ),
+        flagged AS (
+            -- ANOMALY_BITMAP keeps every rule that fired:
+            -- 1 large, 2 outlier, 4 zero price, 8 zero quantity, 16 large buy, 32 mismatch
+            SELECT a.*,
+                   IFF(F_LARGE, 1, 0) + IFF(F_OUTLIER, 2, 0) + IFF(F_ZERO_PRICE, 4, 0)
+                   + IFF(F_ZERO_QUANTITY, 8, 0) + IFF(F_LARGE_BUY, 16, 0)
+                   + IFF(F_MISMATCH, 32, 0) AS ANOMALY_BITMAP,
+                   CASE
+                       WHEN F_LARGE THEN 'Unusually Large Transaction'
+                       WHEN F_OUTLIER THEN 'Statistical Outlier - High Value'
+                       WHEN F_ZERO_PRICE THEN 'Zero Price with Value'
+                       WHEN F_ZERO_QUANTITY THEN 'Zero Quantity with Value'
+                       WHEN F_LARGE_BUY THEN 'Large Buy Transaction'
+                       WHEN F_MISMATCH THEN 'Price-Quantity Mismatch'
+                       ELSE 'Normal'
+                   END AS ANOMALY_TYPE
+            FROM anomalies a
         )
         SELECT a.TRANSACTION_ID, a.CLIENT_ID, a.PORTFOLIO_ID,
                a.TRANSACTION_TYPE, a.TOTAL_AMOUNT, a.QUANTITY, a.PRICE,
-               a.TIMESTAMP, a.TICKER, a.ANOMALY_TYPE,
+               a.TIMESTAMP, a.TICKER, a.ANOMALY_TYPE, a.ANOMALY_BITMAP,
                c.FIRST_NAME, c.LAST_NAME,
                ROUND((a.TOTAL_AMOUNT / NULLIF(a.AVG_AMOUNT, 0) - 1) * 100, 2) AS DEVIATION_FROM_AVG_PCT,
-               ROUND(a.TOTAL_AMOUNT - a.AVG_AMOUNT, 2) AS AMOUNT_DIFFERENCE
-        FROM anomalies a
+               ROUND(a.TOTAL_AMOUNT - a.AVG_AMOUNT, 2) AS AMOUNT_DIFFERENCE,
+               a.AVG_AMOUNT, a.STDDEV_AMOUNT
+        FROM flagged a
         LEFT JOIN CLIENTS c ON a.CLIENT_ID = c.CLIENT_ID
-        WHERE a.ANOMALY_TYPE <> 'Normal'
+        WHERE a.ANOMALY_BITMAP > 0
         ORDER BY a.TIMESTAMP DESC
     """
-    return run_query(sql)
+    df = run_query(sql)
+    if df.empty:
+        return df
+
+    df["Z_SCORE"] = _score_anomalies(
+        df["TOTAL_AMOUNT"].to_numpy(dtype="float64", na_value=np.nan),
+        df["AVG_AMOUNT"].to_numpy(dtype="float64", na_value=np.nan),
+        df["STDDEV_AMOUNT"].to_numpy(dtype="float64", na_value=np.nan),
+    )
+    return df.drop(columns=["AVG_AMOUNT", "STDDEV_AMOUNT"])
 
 
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_event_driven_opportunities() -> pd.DataFrame:
     """Event-Driven Outreach - Life/market events for timely client engagement"""
 
@@ -844,20 +1653,40 @@ def get_event_driven_opportunities() -> pd.DataFrame:
             WHERE START_DATE >= DATEADD(DAY, -90, CURRENT_DATE)
                OR END_DATE >= DATEADD(DAY, -90, CURRENT_DATE)
         ),
-        client_impact AS (
+        has_events AS (
+            -- Evaluated once and broadcast, rather than an EXISTS per client row
+            SELECT COUNT(*) > 0 AS HAS_RECENT FROM recent_market_events
+        ),
+        candidates AS (
+            -- Two narrow branches instead of filtering every client on an OR:
+            -- clients with a life event, plus the rest when over 60 days stale
+            SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME,
+                   c.LIFE_EVENT, c.LAST_UPDATE_TIMESTAMP, lc.LAST_CONTACT
+            FROM CLIENTS c
+            LEFT JOIN CLIENT_LAST_CONTACT lc ON c.CLIENT_ID = lc.CLIENT_ID
+            WHERE c.LIFE_EVENT IS NOT NULL
+            UNION ALL
             SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME,
-                   c.LIFE_EVENT, c.LAST_UPDATE_TIMESTAMP,
-                   MAX(i.TIMESTAMP) AS LAST_CONTACT,
-                   DATEDIFF(DAY, MAX(i.TIMESTAMP), CURRENT_DATE) AS DAYS_SINCE_CONTACT
+                   c.LIFE_EVENT, c.LAST_UPDATE_TIMESTAMP, lc.LAST_CONTACT
             FROM CLIENTS c
-            LEFT JOIN INTERACTIONS i ON c.CLIENT_ID = i.CLIENT_ID
-            GROUP BY 1, 2, 3, 4, 5
+            LEFT JOIN CLIENT_LAST_CONTACT lc ON c.CLIENT_ID = lc.CLIENT_ID
+            WHERE c.LIFE_EVENT IS NULL
+              AND (lc.LAST_CONTACT IS NULL
+                   OR lc.LAST_CONTACT < DATEADD(DAY, -60, CURRENT_DATE))
+        ),
+        client_impact AS (
+            -- Clients never contacted are treated as more than 365 days stale
+            SELECT CLIENT_ID, FIRST_NAME, LAST_NAME,
+                   LIFE_EVENT, LAST_UPDATE_TIMESTAMP, LAST_CONTACT,
+                   DATEDIFF(DAY, LAST_CONTACT, CURRENT_DATE) AS DAYS_SINCE_CONTACT,
+                   COALESCE(DATEDIFF(DAY, LAST_CONTACT, CURRENT_DATE), 366) AS STALE_DAYS
+            FROM candidates
         )
         SELECT ci.CLIENT_ID, ci.FIRST_NAME, ci.LAST_NAME,
                CASE
                    WHEN ci.LIFE_EVENT IS NOT NULL AND ci.LAST_UPDATE_TIMESTAMP >= DATEADD(DAY, -60, CURRENT_DATE) THEN 'Recent Life Event'
-                   WHEN ci.DAYS_SINCE_CONTACT > 90 THEN 'Long-term Re-engagement'
-                   WHEN EXISTS (SELECT 1 FROM recent_market_events) THEN 'Market Event Follow-up'
+                   WHEN ci.STALE_DAYS > 90 THEN 'Long-term Re-engagement'
+                   WHEN he.HAS_RECENT THEN 'Market Event Follow-up'
                    ELSE 'Regular Check-in'
                END AS OUTREACH_TYPE,
                ci.LIFE_EVENT,
@@ -866,22 +1695,22 @@ def get_event_driven_opportunities() -> pd.DataFrame:
                ci.DAYS_SINCE_CONTACT,
                CASE
                    WHEN ci.LIFE_EVENT IN ('Marriage', 'Birth of Child', 'Retirement') THEN 'High'
-                   WHEN ci.DAYS_SINCE_CONTACT > 180 THEN 'High'
-                   WHEN ci.DAYS_SINCE_CONTACT > 90 THEN 'Medium'
+                   WHEN ci.STALE_DAYS > 180 THEN 'High'
+                   WHEN ci.STALE_DAYS > 90 THEN 'Medium'
                    ELSE 'Low'
                END AS PRIORITY,
                CASE
                    WHEN ci.LIFE_EVENT = 'Marriage' THEN 'Joint account setup, beneficiary updates'
                    WHEN ci.LIFE_EVENT = 'Birth of Child' THEN 'Education savings, life insurance review'
                    WHEN ci.LIFE_EVENT = 'Retirement' THEN 'Income planning, asset allocation review'
-                   WHEN ci.DAYS_SINCE_CONTACT > 180 THEN 'Relationship health check, portfolio review'
+                   WHEN ci.STALE_DAYS > 180 THEN 'Relationship health check, portfolio review'
                    ELSE 'Market update, investment opportunities'
                END AS SUGGESTED_DISCUSSION_TOPICS
         FROM client_impact ci
-        WHERE ci.LIFE_EVENT IS NOT NULL OR ci.DAYS_SINCE_CONTACT > 60
+        CROSS JOIN has_events he
         ORDER BY
             CASE PRIORITY WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END,
-            ci.DAYS_SINCE_CONTACT DESC
+            ci.STALE_DAYS DESC
     """
     return run_query(sql)
 
@@ -903,41 +1732,52 @@ def get_sentiment_analysis() -> Dict[str, pd.DataFrame]:
         ORDER BY 1
     """
 
-    # Recent sentiment indicators
+    # Recent notes with tags precomputed in the INTERACTION_TAGS dynamic table
     sentiment_sql = """
-        SELECT CLIENT_ID, INTERACTION_ID, TIMESTAMP, CHANNEL,
-               OUTCOME_NOTES,
-               CASE
-                   WHEN OUTCOME_NOTES LIKE ANY ('%satisfied%', '%happy%', '%pleased%', '%excellent%') THEN 'Positive'
-                   WHEN OUTCOME_NOTES LIKE ANY ('%dissatisfied%', '%unhappy%', '%frustrated%', '%angry%', '%complaint%') THEN 'Negative'
-                   WHEN OUTCOME_NOTES LIKE ANY ('%concerned%', '%worried%', '%question%', '%clarification%') THEN 'Neutral/Concerned'
-                   ELSE 'Neutral'
-               END AS SENTIMENT_INDICATOR,
-               CASE
-                   WHEN OUTCOME_NOTES LIKE '%fee%' THEN 'Fees'
-                   WHEN OUTCOME_NOTES LIKE ANY ('%performance%', '%return%', '%loss%') THEN 'Performance'
-                   WHEN OUTCOME_NOTES LIKE ANY ('%service%', '%response%', '%wait%') THEN 'Service Quality'
-                   WHEN OUTCOME_NOTES LIKE ANY ('%advisor%', '%relationship%') THEN 'Advisor Relationship'
-                   ELSE 'General'
-               END AS ISSUE_CATEGORY
-        FROM INTERACTIONS
-        WHERE OUTCOME_NOTES IS NOT NULL
-          AND TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE)
-        ORDER BY TIMESTAMP DESC
+        SELECT i.CLIENT_ID, i.INTERACTION_ID, i.TIMESTAMP, i.CHANNEL, i.OUTCOME_NOTES,
+               t.SENTIMENT_TAG AS SENTIMENT_INDICATOR,
+               t.ISSUE_TAG AS ISSUE_CATEGORY
+        FROM INTERACTIONS i
+        LEFT JOIN INTERACTION_TAGS t ON t.INTERACTION_ID = i.INTERACTION_ID
+        WHERE i.OUTCOME_NOTES IS NOT NULL
+          AND i.TIMESTAMP >= DATEADD(DAY, -90, CURRENT_DATE)
+        ORDER BY i.TIMESTAMP DESC
         LIMIT 100
     """
 
-    return {
-        "complaints_trend": run_query(complaints_sql),
-        "sentiment_analysis": run_query(sentiment_sql),
-    }
+    # Both result sets are fetched concurrently in one cached batch
+    results = run_queries_parallel(
+        {
+            "complaints_trend": complaints_sql,
+            "sentiment_analysis": sentiment_sql,
+        }
+    )
 
+    # Notes newer than the last refresh are not tagged yet; tag those locally
+    df = results["sentiment_analysis"]
+    if df.empty:
+        return results
+    untagged = df["SENTIMENT_INDICATOR"].isna()
+    if untagged.any():
+        # object dtype: an all-NULL tag column arrives as Arrow null type
+        notes = df.loc[untagged, "OUTCOME_NOTES"]
+        for col, rules, default in (
+            ("SENTIMENT_INDICATOR", SENTIMENT_RULES, "Neutral"),
+            ("ISSUE_CATEGORY", ISSUE_CATEGORY_RULES, "General"),
+        ):
+            df[col] = df[col].astype(object)
+            df.loc[untagged, col] = _label_notes(notes, rules, default)
+    return results
 
+
+# One entry per briefed client: a shorter TTL keeps briefings current, and
+# max_entries bounds memory when advisors page through many clients
+@st.cache_data(ttl=BRIEFING_TTL, show_spinner=False, max_entries=256)
 def generate_wealth_narrative(client_id: str) -> Dict[str, Any]:
     """Wealth Narrative & Client Briefing - Auto-generate client summaries"""
 
     # Client overview
-    overview_sql = f"""
+    overview_sql = """
         SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.RISK_TOLERANCE,
                c.NET_WORTH_ESTIMATE, c.LIFE_EVENT, c.LAST_UPDATE_TIMESTAMP AS LIFE_EVENT_DATE,
                COUNT(DISTINCT p.PORTFOLIO_ID) AS NUM_PORTFOLIOS,
@@ -945,69 +1785,101 @@ def generate_wealth_narrative(client_id: str) -> Dict[str, Any]:
         FROM CLIENTS c
         LEFT JOIN PORTFOLIOS p ON c.CLIENT_ID = p.CLIENT_ID
         LEFT JOIN ADVISOR_CLIENT_RELATIONSHIPS acr ON c.CLIENT_ID = acr.CLIENT_ID
-        WHERE c.CLIENT_ID = '{client_id}'
+        WHERE c.CLIENT_ID = ?
         GROUP BY 1, 2, 3, 4, 5, 6, 7
     """
 
     # Portfolio summary
-    portfolio_sql = f"""
-        WITH latest_positions AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY 1
-        )
+    portfolio_sql = """
         SELECT p.PORTFOLIO_ID, p.STRATEGY_TYPE,
-               SUM(ph.MARKET_VALUE) AS TOTAL_VALUE,
-               COUNT(DISTINCT ph.TICKER) AS NUM_HOLDINGS
+               SUM(lp.MARKET_VALUE) AS TOTAL_VALUE,
+               COUNT(DISTINCT lp.TICKER) AS NUM_HOLDINGS
         FROM PORTFOLIOS p
-        JOIN latest_positions lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
-        JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID AND lp.MAX_TS = ph.TIMESTAMP
-        WHERE p.CLIENT_ID = '{client_id}' AND ph.TICKER <> 'CASH'
+        JOIN LATEST_NONCASH_POSITIONS lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
+        WHERE p.CLIENT_ID = ?
         GROUP BY 1, 2
         ORDER BY TOTAL_VALUE DESC
     """
 
     # Recent interactions
-    interactions_sql = f"""
+    interactions_sql = """
         SELECT TIMESTAMP, INTERACTION_TYPE, CHANNEL, OUTCOME_NOTES
         FROM INTERACTIONS
-        WHERE CLIENT_ID = '{client_id}'
+        WHERE CLIENT_ID = ?
         ORDER BY TIMESTAMP DESC
         LIMIT 10
     """
 
-    return {
-        "overview": run_query(overview_sql),
-        "portfolios": run_query(portfolio_sql),
-        "interactions": run_query(interactions_sql),
-    }
+    # The three lookups are independent, so they run concurrently: wall time
+    # is a single round-trip, same as a multi-statement request, while
+    # client_id stays a bind (execute_string cannot bind parameters).
+    return run_queries_parallel(
+        {
+            "overview": overview_sql,
+            "portfolios": portfolio_sql,
+            "interactions": interactions_sql,
+        },
+        params=(client_id,),
+    )
+
+
+@st.cache_data(ttl=FAST_TTL, show_spinner=False)
+def _client_directory(limit: int = 5000) -> Dict[str, str]:
+    """Client id to display name for the briefing selector, ordered by last name."""
+    df = run_query(
+        """
+        SELECT CLIENT_ID, FIRST_NAME || ' ' || LAST_NAME AS NAME
+        FROM CLIENTS
+        ORDER BY LAST_NAME
+        LIMIT ?
+        """,
+        params=(limit,),
+    )
+    if df.empty:
+        return {}
+    return dict(zip(df["CLIENT_ID"].tolist(), df["NAME"].tolist()))
 
 
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_kyc_insights() -> pd.DataFrame:
     """KYB/KYC Ops Copilot - Client documentation and compliance insights"""
 
     sql = """
-        WITH client_doc_status AS (
+        WITH client_base AS (
             SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME,
                    c.NET_WORTH_ESTIMATE, c.RISK_TOLERANCE,
                    COUNT(DISTINCT p.PORTFOLIO_ID) AS NUM_PORTFOLIOS,
-                   MAX(i.TIMESTAMP) AS LAST_VERIFICATION_CHECK,
-                   DATEDIFF(DAY, MAX(i.TIMESTAMP), CURRENT_DATE) AS DAYS_SINCE_VERIFICATION,
+                   lc.LAST_CONTACT AS LAST_VERIFICATION_CHECK,
+                   DATEDIFF(DAY, lc.LAST_CONTACT, CURRENT_DATE) AS DAYS_SINCE_VERIFICATION
+            FROM CLIENTS c
+            LEFT JOIN PORTFOLIOS p ON c.CLIENT_ID = p.CLIENT_ID
+            LEFT JOIN CLIENT_LAST_CONTACT lc ON c.CLIENT_ID = lc.CLIENT_ID
+            GROUP BY 1, 2, 3, 4, 5, lc.LAST_CONTACT
+        ),
+        tiered AS (
+            -- Net worth tier: 0 up to $5M, 1 above $5M, 2 above $10M
+            SELECT b.*,
+                   IFF(NET_WORTH_ESTIMATE > 5000000, 1, 0)
+                   + IFF(NET_WORTH_ESTIMATE > 10000000, 1, 0) AS NW_TIER,
+                   NUM_PORTFOLIOS > 3 AS IS_COMPLEX
+            FROM client_base b
+        ),
+        client_doc_status AS (
+            SELECT CLIENT_ID, FIRST_NAME, LAST_NAME, NET_WORTH_ESTIMATE,
+                   RISK_TOLERANCE, NUM_PORTFOLIOS, LAST_VERIFICATION_CHECK,
+                   DAYS_SINCE_VERIFICATION,
                    CASE
-                       WHEN c.NET_WORTH_ESTIMATE > 5000000 THEN 'Enhanced Due Diligence Required'
-                       WHEN DATEDIFF(DAY, MAX(i.TIMESTAMP), CURRENT_DATE) > 365 THEN 'Annual Review Due'
-                       WHEN COUNT(DISTINCT p.PORTFOLIO_ID) > 3 THEN 'Complex Structure Review'
+                       WHEN NW_TIER >= 1 THEN 'Enhanced Due Diligence Required'
+                       WHEN DAYS_SINCE_VERIFICATION > 365 THEN 'Annual Review Due'
+                       WHEN IS_COMPLEX THEN 'Complex Structure Review'
                        ELSE 'Standard Monitoring'
                    END AS KYC_STATUS,
                    CASE
-                       WHEN c.NET_WORTH_ESTIMATE > 10000000 THEN 'High'
-                       WHEN c.NET_WORTH_ESTIMATE > 5000000 OR COUNT(DISTINCT p.PORTFOLIO_ID) > 3 THEN 'Medium'
+                       WHEN NW_TIER = 2 THEN 'High'
+                       WHEN NW_TIER = 1 OR IS_COMPLEX THEN 'Medium'
                        ELSE 'Low'
                    END AS RISK_RATING
-            FROM CLIENTS c
-            LEFT JOIN PORTFOLIOS p ON c.CLIENT_ID = p.CLIENT_ID
-            LEFT JOIN INTERACTIONS i ON c.CLIENT_ID = i.CLIENT_ID
-            GROUP BY 1, 2, 3, 4, 5
+            FROM tiered
         )
         SELECT CLIENT_ID, FIRST_NAME, LAST_NAME, NET_WORTH_ESTIMATE,
                RISK_TOLERANCE, NUM_PORTFOLIOS, LAST_VERIFICATION_CHECK,
@@ -1024,6 +1896,7 @@ def get_kyc_insights() -> pd.DataFrame:
             CASE RISK_RATING WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 ELSE 3 END,
             DAYS_SINCE_VERIFICATION DESC
     """
+    # KYC_STATUS, RISK_RATING and RECOMMENDED_ACTIONS arrive as categoricals
     return run_query(sql)
 
 
@@ -1031,214 +1904,188 @@ def get_kyc_insights() -> pd.DataFrame:
 # GEOSPATIAL ANALYTICS FUNCTIONS
 # =============================================================================
 
+# These read hourly dynamic tables and static dimensions, so every loader
+# keeps its frame for 15 minutes across reruns and sessions.
+
+
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
+def get_client_geographic_distribution() -> pd.DataFrame:
+    """Geographic Distribution of Clients - AUM concentration and coverage analysis"""
+
+    # ~50 precomputed state rows; see STATE_AUM in sql/performance_objects.sql
+    sql = """
+        SELECT sa.STATE, sa.CLIENT_COUNT, sa.TOTAL_AUM,
+               ROUND(sa.AVG_AUM_PER_CLIENT, 2) AS AUM_PER_CLIENT,
+               sa.AVG_INCOME, sa.PCT_AGGRESSIVE, sa.PCT_CONSERVATIVE
+        FROM STATE_AUM sa
+        ORDER BY sa.TOTAL_AUM DESC
+    """
+    df = run_query(sql)
+    if not df.empty:
+        df = df.round({"PCT_AGGRESSIVE": 1, "PCT_CONSERVATIVE": 1})
+        df["MARKET_TIER"] = _label_bins(
+            df["TOTAL_AUM"], MARKET_TIER_BINS, MARKET_TIER_LABELS
+        )
+    return df
+
+
+# Client locations in high-risk states with their climate risk profile,
+# shared by the weather risk table and its two summary charts
+_HIGH_RISK_LOCATIONS_CTE = """
+    client_locations AS (
+        SELECT DISTINCT c.STATE, c.CITY, COUNT(DISTINCT c.CLIENT_ID) AS CLIENT_COUNT,
+               SUM(c.PORTFOLIO_VALUE) AS LOCATION_AUM
+        FROM CLIENT_AUM c
+        -- Only high-risk states are reported; filter at the CLIENTS scan
+        WHERE c.STATE IN (
+            SELECT STATE FROM STATE_RISK_DIM WHERE RISK_LEVEL IN ('High', 'Very High')
+        )
+        GROUP BY 1, 2
+    ),
+    state_risk_profile AS (
+        SELECT cl.STATE, cl.CLIENT_COUNT, cl.LOCATION_AUM,
+               d.PRIMARY_CLIMATE_RISK, d.RISK_LEVEL
+        FROM client_locations cl
+        JOIN STATE_RISK_DIM d ON cl.STATE = d.STATE
+    )
+"""
+
+
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
+def get_weather_risk_analysis() -> pd.DataFrame:
+    """Climate & Weather Risk Analysis - Portfolio exposure to weather-sensitive investments"""
+
+    sql = f"""
+        WITH {_HIGH_RISK_LOCATIONS_CTE}
+        SELECT srp.STATE, srp.CLIENT_COUNT, srp.LOCATION_AUM,
+               srp.PRIMARY_CLIMATE_RISK, srp.RISK_LEVEL,
+               ROUND(srp.LOCATION_AUM / NULLIF(srp.CLIENT_COUNT, 0), 2) AS AVG_AUM_PER_CLIENT
+        FROM state_risk_profile srp
+        ORDER BY srp.LOCATION_AUM DESC, srp.STATE
+    """
+    return run_query(sql)
+
 
-def get_client_geographic_distribution() -> pd.DataFrame:
-    """Geographic Distribution of Clients - AUM concentration and coverage analysis"""
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
+def get_weather_risk_by_primary() -> pd.DataFrame:
+    """High-risk AUM and client count per primary climate risk"""
 
-    sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        client_aum AS (
-            SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.CITY, c.STATE, c.ZIP_CODE,
-                   c.NET_WORTH_ESTIMATE, c.ANNUAL_INCOME, c.RISK_TOLERANCE,
-                   COALESCE(cpv.TOTAL_PORTFOLIO_VALUE, 0) AS PORTFOLIO_VALUE
-            FROM CLIENTS c
-            LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID
-        ),
-        state_metrics AS (
-            SELECT STATE,
-                   COUNT(DISTINCT CLIENT_ID) AS CLIENT_COUNT,
-                   SUM(PORTFOLIO_VALUE) AS TOTAL_AUM,
-                   AVG(PORTFOLIO_VALUE) AS AVG_AUM_PER_CLIENT,
-                   SUM(NET_WORTH_ESTIMATE) AS TOTAL_NET_WORTH,
-                   AVG(ANNUAL_INCOME) AS AVG_INCOME,
-                   COUNT(CASE WHEN RISK_TOLERANCE = 'Aggressive Growth' THEN 1 END) AS AGGRESSIVE_CLIENTS,
-                   COUNT(CASE WHEN RISK_TOLERANCE = 'Conservative' THEN 1 END) AS CONSERVATIVE_CLIENTS
-            FROM client_aum
-            WHERE STATE IS NOT NULL
-            GROUP BY 1
-        )
-        SELECT sm.*,
-               ROUND(sm.TOTAL_AUM / NULLIF(sm.CLIENT_COUNT, 0), 2) AS AUM_PER_CLIENT,
-               ROUND(sm.AGGRESSIVE_CLIENTS::FLOAT / NULLIF(sm.CLIENT_COUNT, 0) * 100, 1) AS PCT_AGGRESSIVE,
-               ROUND(sm.CONSERVATIVE_CLIENTS::FLOAT / NULLIF(sm.CLIENT_COUNT, 0) * 100, 1) AS PCT_CONSERVATIVE,
-               CASE
-                   WHEN sm.TOTAL_AUM > 50000000 THEN 'High Value Market'
-                   WHEN sm.TOTAL_AUM > 20000000 THEN 'Medium Value Market'
-                   ELSE 'Emerging Market'
-               END AS MARKET_TIER
-        FROM state_metrics sm
-        ORDER BY sm.TOTAL_AUM DESC
+    sql = f"""
+        WITH {_HIGH_RISK_LOCATIONS_CTE}
+        SELECT PRIMARY_CLIMATE_RISK,
+               SUM(LOCATION_AUM) AS LOCATION_AUM,
+               SUM(CLIENT_COUNT) AS CLIENT_COUNT
+        FROM state_risk_profile
+        GROUP BY 1
     """
     return run_query(sql)
 
 
-def get_weather_risk_analysis() -> pd.DataFrame:
-    """Climate & Weather Risk Analysis - Portfolio exposure to weather-sensitive investments"""
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
+def get_weather_risk_by_sector_sensitivity() -> pd.DataFrame:
+    """High-risk AUM exposed to each weather-sensitive sector"""
 
-    sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        client_locations AS (
-            SELECT DISTINCT c.STATE, c.CITY, COUNT(DISTINCT c.CLIENT_ID) AS CLIENT_COUNT,
-                   COALESCE(SUM(cpv.TOTAL_PORTFOLIO_VALUE), 0) AS LOCATION_AUM
-            FROM CLIENTS c
-            LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID
-            WHERE c.STATE IS NOT NULL
-            GROUP BY 1, 2
-        ),
-        weather_sensitive_sectors AS (
-            SELECT 'Agriculture' AS SECTOR, 'High' AS WEATHER_SENSITIVITY, 'Drought, Flooding, Temperature' AS RISK_FACTORS
-            UNION ALL SELECT 'Energy', 'High', 'Hurricanes, Temperature Extremes'
-            UNION ALL SELECT 'Insurance', 'Very High', 'Natural Disasters, Climate Events'
-            UNION ALL SELECT 'Real Estate', 'Medium', 'Flooding, Hurricanes, Wildfires'
-            UNION ALL SELECT 'Tourism', 'High', 'Weather Patterns, Seasonal Changes'
-            UNION ALL SELECT 'Utilities', 'Medium', 'Storm Damage, Peak Demand'
-        ),
-        state_risk_profile AS (
-            SELECT cl.STATE, cl.CLIENT_COUNT, cl.LOCATION_AUM,
-                   CASE
-                       WHEN cl.STATE IN ('FL', 'TX', 'LA', 'AL', 'MS', 'SC', 'NC') THEN 'Hurricane Risk'
-                       WHEN cl.STATE IN ('CA', 'OR', 'WA', 'CO', 'MT', 'ID') THEN 'Wildfire Risk'
-                       WHEN cl.STATE IN ('IA', 'IL', 'IN', 'KS', 'MO', 'NE', 'OK') THEN 'Tornado Risk'
-                       WHEN cl.STATE IN ('ND', 'SD', 'MN', 'WI', 'MI', 'NY', 'VT') THEN 'Winter Storm Risk'
-                       WHEN cl.STATE IN ('AZ', 'NV', 'UT', 'NM') THEN 'Drought Risk'
-                       ELSE 'Low Climate Risk'
-                   END AS PRIMARY_CLIMATE_RISK,
-                   CASE
-                       WHEN cl.STATE IN ('FL', 'CA', 'TX', 'LA', 'NC') THEN 'Very High'
-                       WHEN cl.STATE IN ('SC', 'AL', 'MS', 'OR', 'WA', 'CO') THEN 'High'
-                       WHEN cl.STATE IN ('IA', 'IL', 'KS', 'MO', 'OK', 'AZ', 'NV') THEN 'Medium'
-                       ELSE 'Low'
-                   END AS RISK_LEVEL
-            FROM client_locations cl
-        )
-        SELECT srp.*,
-               ROUND(srp.LOCATION_AUM / NULLIF(srp.CLIENT_COUNT, 0), 2) AS AVG_AUM_PER_CLIENT,
-               wss.SECTOR, wss.WEATHER_SENSITIVITY, wss.RISK_FACTORS
+    sql = f"""
+        WITH {_HIGH_RISK_LOCATIONS_CTE}
+        SELECT ws.SECTOR, ws.WEATHER_SENSITIVITY,
+               SUM(srp.LOCATION_AUM) AS LOCATION_AUM
         FROM state_risk_profile srp
-        CROSS JOIN weather_sensitive_sectors wss
-        WHERE srp.RISK_LEVEL IN ('High', 'Very High')
-        ORDER BY srp.LOCATION_AUM DESC, srp.STATE
+        CROSS JOIN WEATHER_SECTOR_DIM ws
+        GROUP BY 1, 2
+        ORDER BY 1
     """
     return run_query(sql)
 
 
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_market_penetration_analysis() -> pd.DataFrame:
     """Market Penetration & Opportunity Analysis using demographic and POI data"""
 
     sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        zip_metrics AS (
+        WITH zip_metrics AS (
+            -- CLIENT_AUM holds one row per client, so a plain COUNT(*) is
+            -- exact without a distinct set
             SELECT c.ZIP_CODE, c.STATE, c.CITY,
-                   COUNT(DISTINCT c.CLIENT_ID) AS OUR_CLIENTS,
-                   COALESCE(SUM(cpv.TOTAL_PORTFOLIO_VALUE), 0) AS OUR_AUM,
-                   AVG(c.NET_WORTH_ESTIMATE) AS AVG_NET_WORTH,
-                   AVG(c.ANNUAL_INCOME) AS AVG_INCOME
-            FROM CLIENTS c
-            LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID
+                   COUNT(*) AS OUR_CLIENTS,
+                   SUM(c.PORTFOLIO_VALUE) AS OUR_AUM,
+                   AVG(c.NET_WORTH_ESTIMATE) AS AVG_NET_WORTH
+            FROM CLIENT_AUM c
             WHERE c.ZIP_CODE IS NOT NULL
             GROUP BY 1, 2, 3
         ),
         market_opportunity AS (
             SELECT zm.*,
-                   -- Simulated market data - would integrate with actual POI/demographic data
-                   CASE
-                       WHEN zm.AVG_NET_WORTH > 5000000 THEN 2000
-                       WHEN zm.AVG_NET_WORTH > 1000000 THEN 1000
-                       WHEN zm.AVG_NET_WORTH > 500000 THEN 500
-                       ELSE 200
-                   END AS ESTIMATED_TOTAL_HNW_HOUSEHOLDS,
-                   CASE
-                       WHEN zm.STATE IN ('NY', 'CA', 'CT', 'NJ', 'MA') THEN 'High Wealth Density'
-                       WHEN zm.STATE IN ('FL', 'TX', 'IL', 'WA', 'VA') THEN 'Medium Wealth Density'
-                       ELSE 'Developing Market'
-                   END AS MARKET_TYPE
+                   -- Simulated market data - would integrate with actual POI/demographic data.
+                   -- Steps of 200 / 500 / 1000 / 2000 households summed branch-free
+                   200
+                       + IFF(zm.AVG_NET_WORTH > 500000, 300, 0)
+                       + IFF(zm.AVG_NET_WORTH > 1000000, 500, 0)
+                       + IFF(zm.AVG_NET_WORTH > 5000000, 1000, 0) AS ESTIMATED_TOTAL_HNW_HOUSEHOLDS,
+                   COALESCE(d.MARKET_TYPE, 'Developing Market') AS MARKET_TYPE
             FROM zip_metrics zm
+            LEFT JOIN STATE_RISK_DIM d ON zm.STATE = d.STATE
+        ),
+        penetration AS (
+            -- Penetration in basis points, computed once and compared against
+            -- integer thresholds (500 bps = 5%, 1500 bps = 15%)
+            SELECT mo.*,
+                   DIV0(mo.OUR_CLIENTS * 10000, mo.ESTIMATED_TOTAL_HNW_HOUSEHOLDS) AS PEN_BPS
+            FROM market_opportunity mo
+            WHERE mo.OUR_CLIENTS > 0
         )
-        SELECT mo.*,
-               ROUND(mo.OUR_CLIENTS::FLOAT / NULLIF(mo.ESTIMATED_TOTAL_HNW_HOUSEHOLDS, 0) * 100, 2) AS MARKET_PENETRATION_PCT,
-               ROUND((mo.ESTIMATED_TOTAL_HNW_HOUSEHOLDS - mo.OUR_CLIENTS) * mo.AVG_NET_WORTH * 0.1, 2) AS OPPORTUNITY_VALUE,
+        SELECT pn.ZIP_CODE, pn.STATE, pn.CITY,
+               pn.OUR_CLIENTS, pn.OUR_AUM, pn.AVG_NET_WORTH,
+               pn.ESTIMATED_TOTAL_HNW_HOUSEHOLDS, pn.MARKET_TYPE, pn.PEN_BPS,
+               ROUND((pn.ESTIMATED_TOTAL_HNW_HOUSEHOLDS - pn.OUR_CLIENTS) * pn.AVG_NET_WORTH * 0.1, 2) AS OPPORTUNITY_VALUE,
                CASE
-                   WHEN (mo.OUR_CLIENTS::FLOAT / NULLIF(mo.ESTIMATED_TOTAL_HNW_HOUSEHOLDS, 0) * 100) < 5 THEN 'High Opportunity'
-                   WHEN (mo.OUR_CLIENTS::FLOAT / NULLIF(mo.ESTIMATED_TOTAL_HNW_HOUSEHOLDS, 0) * 100) < 15 THEN 'Medium Opportunity'
+                   WHEN pn.PEN_BPS < 500 THEN 'High Opportunity'
+                   WHEN pn.PEN_BPS < 1500 THEN 'Medium Opportunity'
                    ELSE 'Saturated Market'
                END AS OPPORTUNITY_LEVEL
-        FROM market_opportunity mo
-        WHERE mo.OUR_CLIENTS > 0
-        ORDER BY OPPORTUNITY_VALUE DESC
+        FROM penetration pn
+        ORDER BY OPPORTUNITY_VALUE DESC NULLS LAST
     """
-    return run_query(sql)
+    df = run_query(sql)
+    if not df.empty:
+        df["MARKET_PENETRATION_PCT"] = (
+            df.pop("PEN_BPS").astype("float64") / 100
+        ).round(2)
+    return df
+
 
+def get_top_market_opportunities(n: int = 10) -> pd.DataFrame:
+    """The ``n`` markets with the largest opportunity value."""
+    # The detail table needs every market anyway, and that cached query is
+    # ordered by OPPORTUNITY_VALUE, so its leading rows are the top ``n``
+    return get_market_penetration_analysis().head(n)
 
+
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_advisor_territory_coverage() -> pd.DataFrame:
     """Advisor Territory Coverage & Geographic Efficiency Analysis"""
 
     sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        advisor_geography AS (
+        WITH advisor_geography AS (
             SELECT a.ADVISOR_ID, a.NAME AS ADVISOR_NAME,
                    a.SPECIALIZATION, a.EXPERIENCE_YEARS,
                    c.STATE, c.CITY, c.ZIP_CODE,
                    COUNT(DISTINCT acr.CLIENT_ID) AS CLIENTS_IN_AREA,
-                   COALESCE(SUM(cpv.TOTAL_PORTFOLIO_VALUE), 0) AS AUM_IN_AREA,
-                   -- Simplified distance calculation using state centroids
-                   CASE c.STATE
-                       WHEN 'CA' THEN 1500 WHEN 'TX' THEN 800 WHEN 'FL' THEN 1200
-                       WHEN 'NY' THEN 500 WHEN 'PA' THEN 300 WHEN 'IL' THEN 600
-                       WHEN 'OH' THEN 400 WHEN 'GA' THEN 700 WHEN 'NC' THEN 500
-                       WHEN 'MI' THEN 450 WHEN 'NJ' THEN 200 WHEN 'VA' THEN 350
-                       ELSE 750
-                   END AS ESTIMATED_DISTANCE_MILES
+                   SUM(c.PORTFOLIO_VALUE) AS AUM_IN_AREA,
+                   -- Centroid-to-centroid miles from the advisor's region;
+                   -- 750 when either end has no known centroid
+                   COALESCE(ROUND(d.MILES), 750) AS ESTIMATED_DISTANCE_MILES
             FROM ADVISORS a
             JOIN ADVISOR_CLIENT_RELATIONSHIPS acr ON a.ADVISOR_ID = acr.ADVISOR_ID
-            JOIN CLIENTS c ON acr.CLIENT_ID = c.CLIENT_ID
-            LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID
+            JOIN CLIENT_AUM c ON acr.CLIENT_ID = c.CLIENT_ID
+            LEFT JOIN ADVISOR_STATE_DISTANCE d
+                ON d.ADVISOR_ID = a.ADVISOR_ID AND d.STATE = c.STATE
             WHERE c.STATE IS NOT NULL
             GROUP BY 1, 2, 3, 4, 5, 6, 7, 10
         ),
         territory_metrics AS (
             SELECT ag.ADVISOR_ID, ag.ADVISOR_NAME, ag.SPECIALIZATION,
-                   COUNT(DISTINCT ag.STATE) AS STATES_COVERED,
-                   COUNT(DISTINCT ag.CITY) AS CITIES_COVERED,
+                   APPROX_COUNT_DISTINCT(ag.STATE) AS STATES_COVERED,
+                   APPROX_COUNT_DISTINCT(ag.CITY) AS CITIES_COVERED,
                    SUM(ag.CLIENTS_IN_AREA) AS TOTAL_CLIENTS,
                    SUM(ag.AUM_IN_AREA) AS TOTAL_AUM,
                    ROUND(AVG(ag.ESTIMATED_DISTANCE_MILES), 2) AS AVG_TRAVEL_DISTANCE,
@@ -1251,7 +2098,10 @@ def get_advisor_territory_coverage() -> pd.DataFrame:
             FROM advisor_geography ag
             GROUP BY 1, 2, 3
         )
-        SELECT tm.*,
+        SELECT tm.ADVISOR_NAME, tm.SPECIALIZATION,
+               tm.STATES_COVERED, tm.CITIES_COVERED,
+               tm.TOTAL_CLIENTS, tm.TOTAL_AUM,
+               tm.AVG_TRAVEL_DISTANCE, tm.COVERAGE_TYPE,
                ROUND(tm.TOTAL_AUM / NULLIF(tm.TOTAL_CLIENTS, 0), 2) AS AUM_PER_CLIENT,
                ROUND(tm.TOTAL_CLIENTS / NULLIF(tm.STATES_COVERED, 0), 1) AS CLIENTS_PER_STATE,
                CASE
@@ -1265,112 +2115,36 @@ def get_advisor_territory_coverage() -> pd.DataFrame:
     return run_query(sql)
 
 
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_client_location_details() -> pd.DataFrame:
     """Get client locations with coordinates for mapbox visualization"""
 
     sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        state_coordinates AS (
-            SELECT 'AL' AS STATE, 32.806671 AS LATITUDE, -86.791130 AS LONGITUDE
-            UNION ALL SELECT 'AK', 61.570716, -152.404419
-            UNION ALL SELECT 'AZ', 33.729759, -111.431221
-            UNION ALL SELECT 'AR', 34.969704, -92.373123
-            UNION ALL SELECT 'CA', 36.116203, -119.681564
-            UNION ALL SELECT 'CO', 39.059811, -105.311104
-            UNION ALL SELECT 'CT', 41.767, -72.677
-            UNION ALL SELECT 'DE', 39.161921, -75.526755
-            UNION ALL SELECT 'FL', 27.4518, -81.5158
-            UNION ALL SELECT 'GA', 32.9866, -83.6487
-            UNION ALL SELECT 'HI', 21.1098, -157.5311
-            UNION ALL SELECT 'ID', 44.931109, -116.237651
-            UNION ALL SELECT 'IL', 40.349457, -88.986137
-            UNION ALL SELECT 'IN', 39.790942, -86.147685
-            UNION ALL SELECT 'IA', 42.011539, -93.210526
-            UNION ALL SELECT 'KS', 38.572954, -98.580009
-            UNION ALL SELECT 'KY', 37.669773, -84.670067
-            UNION ALL SELECT 'LA', 31.266683, -91.988312
-            UNION ALL SELECT 'ME', 45.367584, -68.972168
-            UNION ALL SELECT 'MD', 39.161921, -75.526755
-            UNION ALL SELECT 'MA', 42.2352, -71.0275
-            UNION ALL SELECT 'MI', 43.354558, -84.955255
-            UNION ALL SELECT 'MN', 45.7326, -93.9196
-            UNION ALL SELECT 'MS', 32.7673, -89.6812
-            UNION ALL SELECT 'MO', 38.572954, -92.189283
-            UNION ALL SELECT 'MT', 47.052632, -110.454353
-            UNION ALL SELECT 'NE', 41.590939, -99.675285
-            UNION ALL SELECT 'NV', 39.161921, -117.055374
-            UNION ALL SELECT 'NH', 43.452492, -71.563896
-            UNION ALL SELECT 'NJ', 40.221741, -74.756138
-            UNION ALL SELECT 'NM', 34.307144, -106.018066
-            UNION ALL SELECT 'NY', 42.659829, -75.615011
-            UNION ALL SELECT 'NC', 35.771, -78.638
-            UNION ALL SELECT 'ND', 47.259, -99.955
-            UNION ALL SELECT 'OH', 40.269789, -82.955255
-            UNION ALL SELECT 'OK', 35.482309, -97.534994
-            UNION ALL SELECT 'OR', 44.931109, -123.029159
-            UNION ALL SELECT 'PA', 40.269789, -77.727883
-            UNION ALL SELECT 'RI', 41.82355, -71.422132
-            UNION ALL SELECT 'SC', 33.836082, -81.163727
-            UNION ALL SELECT 'SD', 44.268543, -99.672985
-            UNION ALL SELECT 'TN', 35.771, -86.25
-            UNION ALL SELECT 'TX', 31.106, -97.6475
-            UNION ALL SELECT 'UT', 39.161921, -111.431221
-            UNION ALL SELECT 'VT', 44.26639, -72.580536
-            UNION ALL SELECT 'VA', 37.54, -78.64
-            UNION ALL SELECT 'WA', 47.042418, -122.893077
-            UNION ALL SELECT 'WV', 38.349497, -81.633294
-            UNION ALL SELECT 'WI', 44.95, -89.5
-            UNION ALL SELECT 'WY', 42.7475, -107.2085
-            UNION ALL SELECT 'AS', -14.270972, -170.132217  -- American Samoa
-            UNION ALL SELECT 'VI', 18.335765, -64.896335    -- Virgin Islands
-            UNION ALL SELECT 'PW', 7.51498, 134.58252       -- Palau
-        )
         SELECT c.CLIENT_ID,
                c.FIRST_NAME || ' ' || c.LAST_NAME AS CLIENT_NAME,
                c.CITY, c.STATE, c.ZIP_CODE,
                c.NET_WORTH_ESTIMATE, c.RISK_TOLERANCE,
-               COALESCE(cpv.TOTAL_PORTFOLIO_VALUE, 0) AS PORTFOLIO_VALUE,
+               c.PORTFOLIO_VALUE,
                -- Add small random offset to avoid overlapping points
                sc.LATITUDE + (RANDOM() * 0.5 - 0.25) AS LATITUDE,
                sc.LONGITUDE + (RANDOM() * 0.5 - 0.25) AS LONGITUDE
-        FROM CLIENTS c
-        LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID
-        LEFT JOIN state_coordinates sc ON c.STATE = sc.STATE
+        FROM CLIENT_AUM c
+        LEFT JOIN STATE_CENTROID sc ON c.STATE = sc.STATE
         WHERE c.STATE IS NOT NULL AND sc.LATITUDE IS NOT NULL
         LIMIT 1000  -- Limit for performance on map visualization
     """
     return run_query(sql)
 
 
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_advisor_location_details() -> pd.DataFrame:
     """Get advisor locations with coordinates for mapbox visualization"""
 
     sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        advisor_metrics AS (
+        WITH advisor_metrics AS (
             SELECT a.ADVISOR_ID, a.NAME AS ADVISOR_NAME, a.SPECIALIZATION, a.REGION,
                    COUNT(DISTINCT acr.CLIENT_ID) AS TOTAL_CLIENTS,
-                   COALESCE(SUM(cpv.TOTAL_PORTFOLIO_VALUE), 0) AS TOTAL_AUM,
+                   COALESCE(SUM(ca.PORTFOLIO_VALUE), 0) AS TOTAL_AUM,
                    -- Estimate coverage type based on region
                    CASE
                        WHEN a.REGION IN ('California', 'Texas', 'Florida', 'New York') THEN 'Regional Coverage'
@@ -1379,149 +2153,220 @@ def get_advisor_location_details() -> pd.DataFrame:
                    END AS COVERAGE_TYPE
             FROM ADVISORS a
             LEFT JOIN ADVISOR_CLIENT_RELATIONSHIPS acr ON a.ADVISOR_ID = acr.ADVISOR_ID
-            LEFT JOIN client_portfolio_values cpv ON acr.CLIENT_ID = cpv.CLIENT_ID
+            LEFT JOIN CLIENT_AUM ca ON acr.CLIENT_ID = ca.CLIENT_ID
             GROUP BY 1, 2, 3, 4, 7
-        ),
-        region_coordinates AS (
-            SELECT 'California' AS REGION, 36.116203 AS LATITUDE, -119.681564 AS LONGITUDE
-            UNION ALL SELECT 'Texas', 31.106, -97.6475
-            UNION ALL SELECT 'Florida', 27.4518, -81.5158
-            UNION ALL SELECT 'New York', 42.659829, -75.615011
-            UNION ALL SELECT 'Michigan', 43.354558, -84.955255
-            UNION ALL SELECT 'Arizona', 33.729759, -111.431221
-            UNION ALL SELECT 'Indiana', 39.790942, -86.147685
-            UNION ALL SELECT 'Mississippi', 32.7673, -89.6812
-            UNION ALL SELECT 'Illinois', 40.349457, -88.986137
-            UNION ALL SELECT 'Georgia', 32.9866, -83.6487
-            UNION ALL SELECT 'North Carolina', 35.771, -78.638
-            UNION ALL SELECT 'Ohio', 40.269789, -82.955255
-            UNION ALL SELECT 'Pennsylvania', 40.269789, -77.727883
-            UNION ALL SELECT 'Virginia', 37.54, -78.64
-            UNION ALL SELECT 'Washington', 47.042418, -122.893077
-            UNION ALL SELECT 'Colorado', 39.059811, -105.311104
-            UNION ALL SELECT 'Oregon', 44.931109, -123.029159
-            UNION ALL SELECT 'Nevada', 39.161921, -117.055374
-            UNION ALL SELECT 'Utah', 39.161921, -111.431221
-            UNION ALL SELECT 'Connecticut', 41.767, -72.677
-            UNION ALL SELECT 'Massachusetts', 42.2352, -71.0275
-            UNION ALL SELECT 'New Jersey', 40.221741, -74.756138
-            UNION ALL SELECT 'Maryland', 39.161921, -75.526755
-            UNION ALL SELECT 'Wisconsin', 44.95, -89.5
-            UNION ALL SELECT 'Minnesota', 45.7326, -93.9196
         )
         SELECT am.*,
                -- Add small random offset to avoid overlapping points
                rc.LATITUDE + (RANDOM() * 0.3 - 0.15) AS LATITUDE,
                rc.LONGITUDE + (RANDOM() * 0.3 - 0.15) AS LONGITUDE
         FROM advisor_metrics am
-        LEFT JOIN region_coordinates rc ON am.REGION = rc.REGION
+        LEFT JOIN STATE_CENTROID rc ON am.REGION = rc.STATE_NAME
         WHERE rc.LATITUDE IS NOT NULL AND am.TOTAL_CLIENTS > 0
     """
     return run_query(sql)
 
 
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
 def get_climate_risk_locations() -> pd.DataFrame:
     """Get climate risk locations with coordinates for mapbox visualization"""
 
     sql = """
-        WITH client_portfolio_values AS (
-            SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
-            FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
-            GROUP BY 1
-        ),
-        client_locations AS (
+        WITH client_locations AS (
             SELECT DISTINCT c.STATE, c.CITY, COUNT(DISTINCT c.CLIENT_ID) AS CLIENT_COUNT,
-                   COALESCE(SUM(cpv.TOTAL_PORTFOLIO_VALUE), 0) AS LOCATION_AUM
-            FROM CLIENTS c
-            LEFT JOIN client_portfolio_values cpv ON c.CLIENT_ID = cpv.CLIENT_ID
+                   SUM(c.PORTFOLIO_VALUE) AS LOCATION_AUM
+            FROM CLIENT_AUM c
             WHERE c.STATE IS NOT NULL
             GROUP BY 1, 2
         ),
         state_risk_profile AS (
             SELECT cl.STATE, cl.CLIENT_COUNT, cl.LOCATION_AUM,
-                   CASE
-                       WHEN cl.STATE IN ('FL', 'TX', 'LA', 'AL', 'MS', 'SC', 'NC') THEN 'Hurricane Risk'
-                       WHEN cl.STATE IN ('CA', 'OR', 'WA', 'CO', 'MT', 'ID') THEN 'Wildfire Risk'
-                       WHEN cl.STATE IN ('IA', 'IL', 'IN', 'KS', 'MO', 'NE', 'OK') THEN 'Tornado Risk'
-                       WHEN cl.STATE IN ('ND', 'SD', 'MN', 'WI', 'MI', 'NY', 'VT') THEN 'Winter Storm Risk'
-                       WHEN cl.STATE IN ('AZ', 'NV', 'UT', 'NM') THEN 'Drought Risk'
-                       ELSE 'Low Climate Risk'
-                   END AS PRIMARY_CLIMATE_RISK,
-                   CASE
-                       WHEN cl.STATE IN ('FL', 'CA', 'TX', 'LA', 'NC') THEN 'Very High'
-                       WHEN cl.STATE IN ('SC', 'AL', 'MS', 'OR', 'WA', 'CO') THEN 'High'
-                       WHEN cl.STATE IN ('IA', 'IL', 'KS', 'MO', 'OK', 'AZ', 'NV') THEN 'Medium'
-                       ELSE 'Low'
-                   END AS RISK_LEVEL
+                   COALESCE(d.PRIMARY_CLIMATE_RISK, 'Low Climate Risk') AS PRIMARY_CLIMATE_RISK,
+                   COALESCE(d.RISK_LEVEL, 'Low') AS RISK_LEVEL
             FROM client_locations cl
-        ),
-        state_coordinates AS (
-            SELECT 'AL' AS STATE, 32.806671 AS LATITUDE, -86.791130 AS LONGITUDE
-            UNION ALL SELECT 'AK', 61.570716, -152.404419
-            UNION ALL SELECT 'AZ', 33.729759, -111.431221
-            UNION ALL SELECT 'AR', 34.969704, -92.373123
-            UNION ALL SELECT 'CA', 36.116203, -119.681564
-            UNION ALL SELECT 'CO', 39.059811, -105.311104
-            UNION ALL SELECT 'CT', 41.767, -72.677
-            UNION ALL SELECT 'DE', 39.161921, -75.526755
-            UNION ALL SELECT 'FL', 27.4518, -81.5158
-            UNION ALL SELECT 'GA', 32.9866, -83.6487
-            UNION ALL SELECT 'HI', 21.1098, -157.5311
-            UNION ALL SELECT 'ID', 44.931109, -116.237651
-            UNION ALL SELECT 'IL', 40.349457, -88.986137
-            UNION ALL SELECT 'IN', 39.790942, -86.147685
-            UNION ALL SELECT 'IA', 42.011539, -93.210526
-            UNION ALL SELECT 'KS', 38.572954, -98.580009
-            UNION ALL SELECT 'KY', 37.669773, -84.670067
-            UNION ALL SELECT 'LA', 31.266683, -91.988312
-            UNION ALL SELECT 'ME', 45.367584, -68.972168
-            UNION ALL SELECT 'MD', 39.161921, -75.526755
-            UNION ALL SELECT 'MA', 42.2352, -71.0275
-            UNION ALL SELECT 'MI', 43.354558, -84.955255
-            UNION ALL SELECT 'MN', 45.7326, -93.9196
-            UNION ALL SELECT 'MS', 32.7673, -89.6812
-            UNION ALL SELECT 'MO', 38.572954, -92.189283
-            UNION ALL SELECT 'MT', 47.052632, -110.454353
-            UNION ALL SELECT 'NE', 41.590939, -99.675285
-            UNION ALL SELECT 'NV', 39.161921, -117.055374
-            UNION ALL SELECT 'NH', 43.452492, -71.563896
-            UNION ALL SELECT 'NJ', 40.221741, -74.756138
-            UNION ALL SELECT 'NM', 34.307144, -106.018066
-            UNION ALL SELECT 'NY', 42.659829, -75.615011
-            UNION ALL SELECT 'NC', 35.771, -78.638
-            UNION ALL SELECT 'ND', 47.259, -99.955
-            UNION ALL SELECT 'OH', 40.269789, -82.955255
-            UNION ALL SELECT 'OK', 35.482309, -97.534994
-            UNION ALL SELECT 'OR', 44.931109, -123.029159
-            UNION ALL SELECT 'PA', 40.269789, -77.727883
-            UNION ALL SELECT 'RI', 41.82355, -71.422132
-            UNION ALL SELECT 'SC', 33.836082, -81.163727
-            UNION ALL SELECT 'SD', 44.268543, -99.672985
-            UNION ALL SELECT 'TN', 35.771, -86.25
-            UNION ALL SELECT 'TX', 31.106, -97.6475
-            UNION ALL SELECT 'UT', 39.161921, -111.431221
-            UNION ALL SELECT 'VT', 44.26639, -72.580536
-            UNION ALL SELECT 'VA', 37.54, -78.64
-            UNION ALL SELECT 'WA', 47.042418, -122.893077
-            UNION ALL SELECT 'WV', 38.349497, -81.633294
-            UNION ALL SELECT 'WI', 44.95, -89.5
-            UNION ALL SELECT 'WY', 42.7475, -107.2085
+            LEFT JOIN STATE_RISK_DIM d ON cl.STATE = d.STATE
         )
-        SELECT srp.*, sc.LATITUDE, sc.LONGITUDE
+        SELECT srp.STATE, srp.CLIENT_COUNT, srp.LOCATION_AUM,
+               srp.PRIMARY_CLIMATE_RISK, srp.RISK_LEVEL,
+               sc.LATITUDE, sc.LONGITUDE
         FROM state_risk_profile srp
-        LEFT JOIN state_coordinates sc ON srp.STATE = sc.STATE
+        LEFT JOIN STATE_CENTROID sc ON srp.STATE = sc.STATE
         WHERE sc.LATITUDE IS NOT NULL AND srp.LOCATION_AUM > 0
         ORDER BY srp.LOCATION_AUM DESC
     """
     return run_query(sql)
 
 
+# -----------------------------
+# Chart Helpers
+# -----------------------------
+
+
+def render_category_counts(values: pd.Series, title: str) -> None:
+    """
+    Render the count per category as a native Streamlit bar chart.
+
+    For small categorical breakdowns this ships a handful of rows to the
+    browser instead of a full Plotly figure.
+    """
+    counts = values.value_counts().rename("COUNT").to_frame()
+    st.caption(title)
+    st.bar_chart(counts, y="COUNT")
+
+
+TABLE_PREVIEW_ROWS = 200
+
+# Dollar columns of the previewed frames, formatted by the grid itself
+CURRENCY_COLUMNS = (
+    "TOTAL_AUM",
+    "AUM_PER_CLIENT",
+    "AVG_INCOME",
+    "LOCATION_AUM",
+    "OUR_AUM",
+    "AVG_NET_WORTH",
+    "OPPORTUNITY_VALUE",
+)
+
+
+@st.cache_data(ttl=MEDIUM_TTL, show_spinner=False)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """CSV export of a result frame, built once per distinct frame."""
+    return df.to_csv(index=False).encode()
+
+
+def render_table_preview(df: pd.DataFrame, file_name: str, key: str) -> None:
+    """
+    Show the first TABLE_PREVIEW_ROWS rows of ``df`` and offer the full
+    frame as a CSV download, so large results are not shipped to the
+    browser on every rerun. Dollar columns are formatted through
+    column_config rather than a Styler.
+    """
+    currency = st.column_config.NumberColumn(format="$%.0f")
+    st.dataframe(
+        df.head(TABLE_PREVIEW_ROWS),
+        use_container_width=True,
+        height=400,
+        column_config={col: currency for col in CURRENCY_COLUMNS if col in df},
+    )
+    if len(df) > TABLE_PREVIEW_ROWS:
+        st.caption(f"Showing {TABLE_PREVIEW_ROWS:,} of {len(df):,} rows")
+    st.download_button(
+        "Full CSV",
+        _csv_bytes(df),
+        file_name=file_name,
+        mime="text/csv",
+        key=key,
+    )
+
+
+def count_margins(
+    df: pd.DataFrame, first: str, second: str
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    Row counts per value of ``first`` and of ``second``, most frequent
+    first, from one grouped pass over the frame instead of two
+    value_counts scans. Rows missing either value are not counted.
+    """
+    joint = df.groupby([first, second], observed=True).size()
+    return tuple(
+        joint.groupby(level=level, observed=True).sum().sort_values(ascending=False)
+        for level in (0, 1)
+    )
+
+
+def binned_counts(values: pd.Series, groups: pd.Series, bins: int = 30) -> pd.DataFrame:
+    """
+    Histogram counts of ``values`` split by ``groups``, one row per
+    (bin, group) with the bin midpoint in the ``values`` column and the
+    count in ``N``. Plotting these as bars ships ``bins x groups`` points
+    to the browser instead of every raw row. Missing values are skipped.
+    """
+    numeric = values.to_numpy(dtype="float64", na_value=np.nan)
+    present = ~np.isnan(numeric)
+    if not present.any():
+        return pd.DataFrame(columns=[values.name, groups.name, "N"])
+    edges = np.histogram_bin_edges(numeric[present], bins=bins)
+    index = np.searchsorted(edges, numeric[present], side="right") - 1
+    # The right edge is inclusive, as in np.histogram
+    index = np.clip(index, 0, bins - 1)
+    midpoints = (edges[:-1] + edges[1:]) / 2
+    binned = pd.DataFrame(
+        {values.name: midpoints[index], groups.name: groups.to_numpy()[present]}
+    )
+    return binned.groupby([values.name, groups.name]).size().reset_index(name="N")
+
+
+def pie_pair_figure(
+    left: pd.Series, right: pd.Series, titles: Tuple[str, str]
+) -> go.Figure:
+    """
+    Build one figure holding side-by-side pies of two count Series.
+
+    Two neighbouring pies then cost one figure's JSON and one layout pass
+    in the browser instead of two.
+    """
+    fig = make_subplots(
+        rows=1,
+        cols=2,
+        specs=[[{"type": "pie"}, {"type": "pie"}]],
+        subplot_titles=titles,
+    )
+    for col, counts in enumerate((left, right), start=1):
+        fig.add_trace(
+            go.Pie(labels=counts.index.astype(str), values=counts.to_numpy()),
+            row=1,
+            col=col,
+        )
+    return fig
+
+
+@st.cache_resource(ttl=MEDIUM_TTL, show_spinner=False, max_entries=64)
+def cached_px_figure(
+    kind: str, df: pd.DataFrame, layout: Optional[Dict[str, Any]] = None, **kwargs
+) -> go.Figure:
+    """
+    Build ``px.<kind>(df, **kwargs)`` once per distinct frame and arguments.
+
+    The figure is keyed on Streamlit's hash of ``df``, so reruns over the
+    same cached data reuse the built figure instead of reconstructing it.
+    The returned figure is shared across sessions and must not be mutated;
+    pass layout tweaks through ``layout`` instead.
+    """
+    fig = getattr(px, kind)(df, **kwargs)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+@st.cache_resource(ttl=MEDIUM_TTL, show_spinner=False, max_entries=16)
+def state_choropleth_figure(
+    df: pd.DataFrame, value: str, title: str, label: str
+) -> go.Figure:
+    """
+    US state choropleth of ``value`` from a frame with one row per STATE.
+
+    A single go.Choropleth trace over plain arrays skips plotly.express's
+    grouping and coloraxis setup, and the figure holds no frame reference.
+    Cached like cached_px_figure, so it must not be mutated.
+    """
+    fig = go.Figure(
+        go.Choropleth(
+            locations=df["STATE"].astype(str).to_numpy(),
+            z=df[value].to_numpy(dtype="float64", na_value=np.nan),
+            locationmode="USA-states",
+            colorscale="Blues",
+            colorbar_title=label,
+            hovertemplate=f"%{{location}}<br>{label}: %{{z:,.0f}}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=title,
+        geo=dict(scope="usa", bgcolor="rgba(0,0,0,0)"),
+        margin=dict(l=0, r=0, t=40, b=0),
+    )
+    return fig
+
+
 # -----------------------------
 # UI Layout
 # -----------------------------
@@ -1701,16 +2546,32 @@ tabs = st.tabs(
     ]
 )
 
+# Each tab body is a fragment: interacting with a widget inside a tab (the
+# show-all toggles, the client picker) reruns only that tab, not the whole
+# dashboard. Sidebar changes still trigger a full rerun.
+
 
 # 📊 Executive Dashboard - High-level KPIs and alerts
-with tabs[0]:
+@st.fragment
+def _render_executive_dashboard_tab() -> None:
     st.markdown("## 📊 Executive Dashboard")
     st.caption(
         "🚀 **Real-time insights and key performance indicators across all business areas**"
     )
 
-    # Global KPIs Row
-    global_kpis = get_global_kpis()
+    # Only this tab's loaders: they are independent, so load them together
+    prefetch_loaders(
+        get_global_kpis,
+        get_wealth_segment_counts,
+        functools.partial(get_top_segments, 20),
+    )
+
+    # Global KPIs Row; a failed lookup was already reported by run_row
+    try:
+        global_kpis = get_global_kpis()
+    except Exception as e:
+        logger.warning(f"Global KPIs unavailable: {e}")
+        global_kpis = {}
     if global_kpis and len(global_kpis) > 0:
         kpi_data = global_kpis
 
@@ -1848,40 +2709,49 @@ with tabs[0]:
 
     with summary_col2:
         # Segment Performance (using actual data)
-        customer_data = get_customer_360_segments()
-        segments_df = customer_data["segments"]
-        if not segments_df.empty:
-            segment_counts = segments_df["WEALTH_SEGMENT"].value_counts()
+        segment_counts = get_wealth_segment_counts()
+        if not segment_counts.empty:
             fig_segments = px.pie(
-                values=segment_counts.values,
-                names=segment_counts.index,
+                segment_counts,
+                names="WEALTH_SEGMENT",
+                values="N",
                 title="🎯 Client Distribution by Wealth Segment",
             )
             st.plotly_chart(fig_segments, use_container_width=True)
+            with st.expander("Top 20 clients by AUM"):
+                st.dataframe(get_top_segments(20), use_container_width=True)
+
+
+with tabs[0]:
+    _render_executive_dashboard_tab()
 
 
 # 🎁 Next Best Action (Cross/Upsell)
-with tabs[1]:
+@st.fragment
+def _render_next_best_action_tab() -> None:
     st.subheader("🎁 Next Best Action - Cross/Upsell Recommendations")
     st.caption(
         "Recommend card/loan/insurance/portfolio actions | KPIs: Offer CTR, conversion, AUM lift"
     )
 
-    nba_df = get_next_best_actions()
-    if not nba_df.empty:
+    top_nba = get_next_best_actions_top(15)
+    if not top_nba.empty:
         # Priority distribution
-        priority_counts = nba_df["PRIORITY"].value_counts()
+        priority_counts = get_next_best_actions_summary()
         col1, col2, col3 = st.columns(3)
-        col1.metric("High Priority", priority_counts.get("High", 0))
-        col2.metric("Medium Priority", priority_counts.get("Medium", 0))
-        col3.metric("Low Priority", priority_counts.get("Low", 0))
+        col1.metric("High Priority", priority_counts["High"])
+        col2.metric("Medium Priority", priority_counts["Medium"])
+        col3.metric("Low Priority", priority_counts["Low"])
 
         st.subheader("🎯 Recommended Actions")
-        st.dataframe(nba_df, use_container_width=True)
+        if st.toggle("Show all recommendations", key="nba_show_all"):
+            st.dataframe(get_next_best_actions(), use_container_width=True)
+        else:
+            st.dataframe(top_nba, use_container_width=True)
 
         # Revenue impact
         fig = px.bar(
-            nba_df.head(15),
+            top_nba,
             x="RECOMMENDED_ACTION",
             y="ESTIMATED_REVENUE_IMPACT",
             color="PRIORITY",
@@ -1893,8 +2763,13 @@ with tabs[1]:
         st.info("No recommendations available.")
 
 
+with tabs[1]:
+    _render_next_best_action_tab()
+
+
 # ⚠️ Attrition/Churn Early Warning
-with tabs[2]:
+@st.fragment
+def _render_churn_warning_tab() -> None:
     st.subheader("⚠️ Attrition/Churn Early Warning")
     st.caption(
         "Catch balance flight & engagement drop | KPIs: Churn rate, save rate, time-to-contact"
@@ -1926,13 +2801,28 @@ with tabs[2]:
         st.success("✅ No clients currently at high churn risk.")
 
 
+with tabs[2]:
+    _render_churn_warning_tab()
+
+
 # ⚖️ Suitability & Risk Drift Alerts
-with tabs[3]:
+@st.fragment
+def _render_suitability_tab() -> None:
     st.subheader("⚖️ Suitability & Risk Drift Alerts")
     st.caption(
         "Ensure portfolio aligns to risk tolerance | KPIs: Suitability breaches, time-to-remediate"
     )
 
+    # Only this tab's loaders; the toggle's previous value picks the limit
+    prefetch_loaders(
+        get_suitability_mismatches,
+        functools.partial(
+            get_concentration_breaches,
+            threshold_pct=concentration_threshold,
+            limit=None if st.session_state.get("conc_show_all") else 500,
+        ),
+    )
+
     # Traditional suitability check
     mism = get_suitability_mismatches()
     if not mism.empty:
@@ -1954,7 +2844,10 @@ with tabs[3]:
 
     # Enhanced concentration analysis
     st.divider()
-    conc = get_concentration_breaches(threshold_pct=concentration_threshold)
+    show_all_conc = st.toggle("Show all breaches", key="conc_show_all")
+    conc = get_concentration_breaches(
+        threshold_pct=concentration_threshold, limit=None if show_all_conc else 500
+    )
     if not conc.empty:
         st.subheader("⚠️ Concentration Risk Alerts")
         st.dataframe(conc, use_container_width=True)
@@ -1971,14 +2864,22 @@ with tabs[3]:
         st.success("✅ No concentration breaches at selected threshold.")
 
 
+with tabs[3]:
+    _render_suitability_tab()
+
+
 # 📊 Portfolio Drift & Rebalance
-with tabs[4]:
+@st.fragment
+def _render_portfolio_drift_tab() -> None:
     st.subheader("📊 Portfolio Drift & Rebalance")
     st.caption(
         "Alert on asset-class drift vs strategy | KPIs: Drift % over threshold, rebalance yield"
     )
 
-    drift_df = get_portfolio_drift_analysis()
+    show_all_drift = st.toggle(
+        "Show all positions (default: top 500 by drift)", key="drift_show_all"
+    )
+    drift_df = get_portfolio_drift_analysis(limit=None if show_all_drift else 500)
     if not drift_df.empty:
         # Drift status summary
         drift_counts = drift_df["DRIFT_STATUS"].value_counts()
@@ -2006,18 +2907,28 @@ with tabs[4]:
         st.info("No portfolio drift data available.")
 
 
+with tabs[4]:
+    _render_portfolio_drift_tab()
+
+
 # 💰 Idle Cash / Cash-Sweep
-with tabs[5]:
+@st.fragment
+def _render_idle_cash_tab() -> None:
     st.subheader("💰 Idle Cash / Cash-Sweep Opportunities")
     st.caption("Monetize idle balances | KPIs: Cash ratio, NII uplift")
 
-    cash_df = get_idle_cash_analysis()
+    show_all_cash = st.toggle(
+        "Show all portfolios (default: top 500 by cash balance)", key="cash_show_all"
+    )
+    cash_df = get_idle_cash_analysis(limit=None if show_all_cash else 500)
     if not cash_df.empty:
-        # Cash opportunity summary
-        high_cash = cash_df[cash_df["CASH_STATUS"].str.contains("High")].shape[0]
-        investment_opps = cash_df[
-            cash_df["RECOMMENDATION"] == "Investment Opportunity"
-        ].shape[0]
+        # Cash opportunity summary. CASH_STATUS is categorical and
+        # RECOMMENDATION Arrow-backed, so both masks compare codes/buffers in
+        # a single vectorized pass with no row copies
+        high_cash = int((cash_df["CASH_STATUS"] == CASH_STATUS_LABELS[-1]).sum())
+        investment_opps = int(
+            (cash_df["RECOMMENDATION"] == "Investment Opportunity").sum()
+        )
         total_idle_cash = cash_df["CASH_BALANCE"].sum()
         potential_nii = cash_df["POTENTIAL_ANNUAL_NII"].sum()
 
@@ -2042,8 +2953,13 @@ with tabs[5]:
         st.info("No cash sweep opportunities identified.")
 
 
+with tabs[5]:
+    _render_idle_cash_tab()
+
+
 # 🔍 Trade & Transaction Anomaly Detection
-with tabs[6]:
+@st.fragment
+def _render_trade_anomalies_tab() -> None:
     st.subheader("🔍 Trade & Transaction Anomaly Detection")
     st.caption(
         "Catch unusual patterns/outliers | KPIs: Transaction integrity, operational risk detection"
@@ -2052,14 +2968,10 @@ with tabs[6]:
     anomalies_df = get_trade_fee_anomalies()
     if not anomalies_df.empty:
         # Anomaly type distribution
-        anomaly_counts = anomalies_df["ANOMALY_TYPE"].value_counts()
         st.subheader("🚨 Anomaly Type Distribution")
-        fig = px.pie(
-            values=anomaly_counts.values,
-            names=anomaly_counts.index,
-            title="Transaction Anomaly Types (Last 90 Days)",
+        render_category_counts(
+            anomalies_df["ANOMALY_TYPE"], "Transaction Anomaly Types (Last 90 Days)"
         )
-        st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("⚠️ Recent Transaction Anomalies")
         st.dataframe(anomalies_df, use_container_width=True)
@@ -2071,7 +2983,7 @@ with tabs[6]:
             y="DEVIATION_FROM_AVG_PCT",
             color="ANOMALY_TYPE",
             size="QUANTITY",
-            hover_data=["TICKER", "FIRST_NAME", "LAST_NAME"],
+            hover_data=["TICKER", "FIRST_NAME", "LAST_NAME", "Z_SCORE"],
             title="Transaction Amount vs Deviation from Average (Anomalies Only)",
         )
         st.plotly_chart(fig2, use_container_width=True)
@@ -2079,8 +2991,13 @@ with tabs[6]:
         st.success("✅ No transaction anomalies detected in the last 90 days.")
 
 
+with tabs[6]:
+    _render_trade_anomalies_tab()
+
+
 # 👥 Advisor Productivity & Coverage
-with tabs[7]:
+@st.fragment
+def _render_advisor_productivity_tab() -> None:
     st.subheader("👥 Advisor Productivity & Coverage")
     st.caption(
         "Improve book management & cadences | KPIs: Coverage %, last-contact SLA, meetings/client"
@@ -2116,8 +3033,13 @@ with tabs[7]:
         st.info("No advisor productivity data available.")
 
 
+with tabs[7]:
+    _render_advisor_productivity_tab()
+
+
 # 📅 Event-Driven Outreach
-with tabs[8]:
+@st.fragment
+def _render_event_outreach_tab() -> None:
     st.subheader("📅 Event-Driven Outreach (Life/Market)")
     st.caption(
         "Timely, contextual nudge at life/market events | KPIs: Engagement rate, booked meetings"
@@ -2136,19 +3058,20 @@ with tabs[8]:
         st.dataframe(events_df, use_container_width=True)
 
         # Outreach type distribution
-        outreach_counts = events_df["OUTREACH_TYPE"].value_counts()
-        fig = px.bar(
-            x=outreach_counts.index,
-            y=outreach_counts.values,
-            title="Outreach Opportunities by Type",
+        render_category_counts(
+            events_df["OUTREACH_TYPE"], "Outreach Opportunities by Type"
         )
-        st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No immediate outreach opportunities identified.")
 
 
+with tabs[8]:
+    _render_event_outreach_tab()
+
+
 # 💬 Complaint/Sentiment Intelligence
-with tabs[9]:
+@st.fragment
+def _render_sentiment_tab() -> None:
     st.subheader("💬 Complaint/Sentiment Intelligence")
     st.caption("Mine notes for issues & intent | KPIs: NPS proxy, time-to-resolution")
 
@@ -2179,33 +3102,32 @@ with tabs[9]:
     sentiment_df = sentiment_data["sentiment_analysis"]
     if not sentiment_df.empty:
         st.subheader("😊 Recent Sentiment Analysis")
-        sentiment_counts = sentiment_df["SENTIMENT_INDICATOR"].value_counts()
-        fig3 = px.pie(
-            values=sentiment_counts.values,
-            names=sentiment_counts.index,
-            title="Sentiment Distribution (Last 90 Days)",
+        render_category_counts(
+            sentiment_df["SENTIMENT_INDICATOR"], "Sentiment Distribution (Last 90 Days)"
         )
-        st.plotly_chart(fig3, use_container_width=True)
 
         st.dataframe(sentiment_df.head(20), use_container_width=True)
 
 
+with tabs[9]:
+    _render_sentiment_tab()
+
+
 # 🤖 Wealth Narrative & Client Briefing (GenAI)
-with tabs[10]:
+@st.fragment
+def _render_wealth_narrative_tab() -> None:
     st.subheader("🤖 Wealth Narrative & Client Briefing (GenAI)")
     st.caption(
         "Auto-generate client summaries & talking points | KPIs: Prep time saved, call quality score"
     )
 
     # Client selector
-    all_clients = run_query(
-        "SELECT CLIENT_ID, FIRST_NAME, LAST_NAME FROM CLIENTS ORDER BY LAST_NAME"
-    )
-    if not all_clients.empty:
+    name_map = _client_directory()
+    if name_map:
         selected_client = st.selectbox(
             "Select Client for AI-Generated Briefing:",
-            options=all_clients["CLIENT_ID"].tolist(),
-            format_func=lambda x: f"{all_clients[all_clients['CLIENT_ID']==x]['FIRST_NAME'].iloc[0]} {all_clients[all_clients['CLIENT_ID']==x]['LAST_NAME'].iloc[0]} ({x})",
+            options=list(name_map),
+            format_func=lambda x: f"{name_map[x]} ({x})",
         )
 
         if selected_client:
@@ -2215,6 +3137,8 @@ with tabs[10]:
             overview_df = narrative_data["overview"]
             if not overview_df.empty:
                 client_info = overview_df.iloc[0]
+                # One missing-value pass over the row, reused by every field
+                present = client_info.notna().to_dict()
                 st.subheader(
                     f"👤 Client Profile: {client_info['FIRST_NAME']} {client_info['LAST_NAME']}"
                 )
@@ -2225,7 +3149,7 @@ with tabs[10]:
                     "Net Worth",
                     (
                         f"${client_info['NET_WORTH_ESTIMATE']:,.0f}"
-                        if pd.notna(client_info["NET_WORTH_ESTIMATE"])
+                        if present["NET_WORTH_ESTIMATE"]
                         else "N/A"
                     ),
                 )
@@ -2238,12 +3162,12 @@ with tabs[10]:
                     f"• Risk profile alignment: Client has {client_info['RISK_TOLERANCE']} risk tolerance with {client_info['NUM_PORTFOLIOS']} portfolio(s)",
                     (
                         f"• Wealth positioning: Estimated net worth of ${client_info['NET_WORTH_ESTIMATE']:,.0f}"
-                        if pd.notna(client_info["NET_WORTH_ESTIMATE"])
+                        if present["NET_WORTH_ESTIMATE"]
                         else "• Wealth positioning: Net worth estimate not available"
                     ),
                     (
                         f"• Life events: {client_info['LIFE_EVENT']} on {client_info['LIFE_EVENT_DATE']}"
-                        if pd.notna(client_info["LIFE_EVENT"])
+                        if present["LIFE_EVENT"]
                         else "• Life events: No recent life events recorded"
                     ),
                 ]
@@ -2263,46 +3187,41 @@ with tabs[10]:
                 st.dataframe(interactions_df, use_container_width=True)
 
 
+with tabs[10]:
+    _render_wealth_narrative_tab()
+
+
 # 📋 KYB/KYC Ops Copilot (GenAI)
-with tabs[11]:
+@st.fragment
+def _render_kyc_copilot_tab() -> None:
     st.subheader("📋 KYB/KYC Ops Copilot (GenAI)")
     st.caption("Speed up checks & documentation Q&A | KPIs: Cycle time, touchless rate")
 
     kyc_df = get_kyc_insights()
     if not kyc_df.empty:
         # KYC status summary
-        kyc_counts = kyc_df["KYC_STATUS"].value_counts()
-        risk_counts = kyc_df["RISK_RATING"].value_counts()
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("📋 KYC Status Distribution")
-            fig = px.pie(
-                values=kyc_counts.values,
-                names=kyc_counts.index,
-                title="KYC Review Status",
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        kyc_counts, risk_counts = count_margins(kyc_df, "KYC_STATUS", "RISK_RATING")
 
-        with col2:
-            st.subheader("⚖️ Risk Rating Distribution")
-            fig2 = px.pie(
-                values=risk_counts.values,
-                names=risk_counts.index,
-                title="Client Risk Ratings",
-            )
-            st.plotly_chart(fig2, use_container_width=True)
+        st.subheader("📋 KYC Status & ⚖️ Risk Rating Distribution")
+        fig = pie_pair_figure(
+            kyc_counts, risk_counts, ("KYC Review Status", "Client Risk Ratings")
+        )
+        st.plotly_chart(fig, use_container_width=True, key="kyc_pies")
 
         st.subheader("📋 KYC Action Items")
-        st.dataframe(kyc_df, use_container_width=True)
+        render_table_preview(kyc_df, "kyc_action_items.csv", key="kyc_csv")
 
         # Days since verification analysis
-        fig3 = px.histogram(
-            kyc_df,
+        fig3 = px.bar(
+            binned_counts(kyc_df["DAYS_SINCE_VERIFICATION"], kyc_df["RISK_RATING"]),
             x="DAYS_SINCE_VERIFICATION",
+            y="N",
             color="RISK_RATING",
+            barmode="stack",
             title="Days Since Last Verification by Risk Rating",
+            labels={"N": "count"},
         )
+        fig3.update_layout(bargap=0)
         st.plotly_chart(fig3, use_container_width=True)
 
         # AI Copilot simulation
@@ -2320,13 +3239,16 @@ with tabs[11]:
         st.success("✅ All clients are up to date with KYC requirements.")
 
 
-# 🌍 Geospatial Analytics
-with tabs[12]:
-    st.subheader("🌍 Geospatial Analytics & Climate Risk")
-    st.caption(
-        "Location-based insights using Snowflake Weather & POI data | KPIs: Geographic AUM distribution, climate risk exposure, market penetration"
-    )
+with tabs[11]:
+    _render_kyc_copilot_tab()
 
+
+# 🌍 Geospatial Analytics
+# This tab is fragmented per panel rather than as a whole, so a download or
+# other interaction in one panel reruns only that panel and leaves the
+# other panels' maps and charts alone.
+@st.fragment
+def _render_geo_distribution_panel() -> None:
     # Geographic Distribution Analysis
     st.subheader("🗺️ Geographic Distribution & Market Concentration")
     geo_dist_df = get_client_geographic_distribution()
@@ -2335,7 +3257,8 @@ with tabs[12]:
         col1, col2 = st.columns(2)
         with col1:
             top_states = geo_dist_df.head(10)
-            fig = px.bar(
+            fig = cached_px_figure(
+                "bar",
                 top_states,
                 x="STATE",
                 y="TOTAL_AUM",
@@ -2343,22 +3266,18 @@ with tabs[12]:
                 title="Top States by Total AUM",
                 labels={"TOTAL_AUM": "Total AUM ($)", "STATE": "State"},
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, key="geo_top_states")
 
         with col2:
             # Geographic choropleth map
-            fig_map = px.choropleth(
+            # STATE_AUM already holds one row per state
+            fig_map = state_choropleth_figure(
                 geo_dist_df,
-                locations="STATE",
-                color="TOTAL_AUM",
-                locationmode="USA-states",
-                scope="usa",
+                "TOTAL_AUM",
                 title="AUM Distribution Across United States",
-                labels={"TOTAL_AUM": "Total AUM ($)"},
-                color_continuous_scale="Blues",
+                label="Total AUM ($)",
             )
-            fig_map.update_layout(geo=dict(bgcolor="rgba(0,0,0,0)"))
-            st.plotly_chart(fig_map, use_container_width=True)
+            st.plotly_chart(fig_map, use_container_width=True, key="geo_choropleth")
 
         # Interactive Mapbox visualization for client locations
         st.subheader("🗺️ Interactive Client Location Map")
@@ -2402,8 +3321,11 @@ with tabs[12]:
             }
 
             # Add color column
-            client_locations_df["color"] = client_locations_df["RISK_TOLERANCE"].map(
-                lambda x: risk_color_map.get(x, [128, 128, 128, 180])  # Gray default
+            # RISK_TOLERANCE is categorical; map plain values so lists are allowed
+            client_locations_df["color"] = (
+                client_locations_df["RISK_TOLERANCE"]
+                .astype(object)
+                .map(lambda x: risk_color_map.get(x, [128, 128, 128, 180]))  # Gray
             )
 
             # Create PyDeck 3D scatter plot
@@ -2447,7 +3369,8 @@ with tabs[12]:
         # Risk profile analysis
         col3, col4 = st.columns(2)
         with col3:
-            fig_risk = px.scatter(
+            fig_risk = cached_px_figure(
+                "scatter",
                 geo_dist_df,
                 x="PCT_CONSERVATIVE",
                 y="PCT_AGGRESSIVE",
@@ -2459,68 +3382,74 @@ with tabs[12]:
                     "PCT_CONSERVATIVE": "% Conservative Clients",
                     "PCT_AGGRESSIVE": "% Aggressive Clients",
                 },
+                render_mode="webgl",
             )
-            st.plotly_chart(fig_risk, use_container_width=True)
+            st.plotly_chart(fig_risk, use_container_width=True, key="geo_risk_mix")
 
         with col4:
-            fig_income = px.box(
+            fig_income = cached_px_figure(
+                "box",
                 geo_dist_df,
                 x="MARKET_TIER",
                 y="AVG_INCOME",
                 title="Average Income by Market Tier",
                 labels={"AVG_INCOME": "Average Income ($)"},
             )
-            st.plotly_chart(fig_income, use_container_width=True)
+            st.plotly_chart(fig_income, use_container_width=True, key="geo_income")
 
         st.subheader("📊 Geographic Distribution Details")
-        st.dataframe(geo_dist_df, use_container_width=True)
+        render_table_preview(geo_dist_df, "state_distribution.csv", key="geo_dist_csv")
 
+
+@st.fragment
+def _render_climate_risk_panel() -> None:
     # Climate & Weather Risk Analysis
     st.subheader("🌪️ Climate & Weather Risk Exposure")
     weather_risk_df = get_weather_risk_analysis()
     if not weather_risk_df.empty:
-        # Primary climate risks
-        risk_summary = (
-            weather_risk_df.groupby("PRIMARY_CLIMATE_RISK")
-            .agg({"LOCATION_AUM": "sum", "CLIENT_COUNT": "sum"})
-            .reset_index()
-        )
-
         col1, col2 = st.columns(2)
         with col1:
+            # Primary climate risks
             fig_climate = px.pie(
-                risk_summary,
+                get_weather_risk_by_primary(),
                 values="LOCATION_AUM",
                 names="PRIMARY_CLIMATE_RISK",
                 title="AUM Exposure by Climate Risk Type",
             )
-            st.plotly_chart(fig_climate, use_container_width=True)
+            st.plotly_chart(
+                fig_climate, use_container_width=True, key="geo_climate_risk"
+            )
 
         with col2:
             # Weather sensitivity by sector
-            sector_analysis = (
-                weather_risk_df.groupby(["SECTOR", "WEATHER_SENSITIVITY"])
-                .agg({"LOCATION_AUM": "sum"})
-                .reset_index()
-            )
-            fig_sector = px.bar(
-                sector_analysis,
+            fig_sector = cached_px_figure(
+                "bar",
+                get_weather_risk_by_sector_sensitivity(),
                 x="SECTOR",
                 y="LOCATION_AUM",
                 color="WEATHER_SENSITIVITY",
                 title="Weather-Sensitive Sector Exposure",
                 labels={"LOCATION_AUM": "Exposed AUM ($)"},
+                layout={
+                    "xaxis_tickangle": 45,
+                    "margin": dict(l=0, r=0, t=40, b=0),
+                },
+            )
+            st.plotly_chart(
+                fig_sector, use_container_width=True, key="geo_sector_exposure"
             )
-            fig_sector.update_layout(xaxis_tickangle=45)
-            st.plotly_chart(fig_sector, use_container_width=True)
 
         st.subheader("⚠️ Climate Risk Assessment Details")
-        st.dataframe(weather_risk_df, use_container_width=True)
+        render_table_preview(
+            weather_risk_df, "climate_risk.csv", key="weather_risk_csv"
+        )
 
         # Climate risk insights
-        high_risk_states = weather_risk_df[weather_risk_df["RISK_LEVEL"] == "Very High"]
-        if not high_risk_states.empty:
-            total_high_risk_aum = high_risk_states["LOCATION_AUM"].sum()
+        very_high_risk = weather_risk_df["RISK_LEVEL"].eq("Very High")
+        if very_high_risk.any():
+            total_high_risk_aum = weather_risk_df["LOCATION_AUM"].where(
+                very_high_risk, 0
+            ).sum()
             st.warning(
                 f"🚨 **High Climate Risk Exposure**: ${total_high_risk_aum:,.2f} AUM in very high-risk locations"
             )
@@ -2538,8 +3467,10 @@ with tabs[12]:
             }
 
             # Add color and elevation based on risk and AUM
-            climate_locations_df["color"] = climate_locations_df["RISK_LEVEL"].map(
-                lambda x: risk_level_colors.get(x, [128, 128, 128, 160])
+            climate_locations_df["color"] = (
+                climate_locations_df["RISK_LEVEL"]
+                .astype(object)
+                .map(lambda x: risk_level_colors.get(x, [128, 128, 128, 160]))
             )
             climate_locations_df["elevation"] = (
                 np.log1p(climate_locations_df["LOCATION_AUM"]) * 50
@@ -2580,6 +3511,9 @@ with tabs[12]:
                 )
             )
 
+
+@st.fragment
+def _render_market_penetration_panel() -> None:
     # Market Penetration & Opportunity Analysis
     st.subheader("🎯 Market Penetration & Growth Opportunities")
     market_df = get_market_penetration_analysis()
@@ -2587,7 +3521,8 @@ with tabs[12]:
         # Opportunity analysis
         col1, col2 = st.columns(2)
         with col1:
-            fig_penetration = px.scatter(
+            fig_penetration = cached_px_figure(
+                "scatter",
                 market_df,
                 x="MARKET_PENETRATION_PCT",
                 y="OPPORTUNITY_VALUE",
@@ -2599,13 +3534,17 @@ with tabs[12]:
                     "MARKET_PENETRATION_PCT": "Market Penetration (%)",
                     "OPPORTUNITY_VALUE": "Opportunity Value ($)",
                 },
+                render_mode="webgl",
+            )
+            st.plotly_chart(
+                fig_penetration, use_container_width=True, key="geo_penetration"
             )
-            st.plotly_chart(fig_penetration, use_container_width=True)
 
         with col2:
             # Top opportunities
-            top_opportunities = market_df.nlargest(10, "OPPORTUNITY_VALUE")
-            fig_opp = px.bar(
+            top_opportunities = get_top_market_opportunities(10)
+            fig_opp = cached_px_figure(
+                "bar",
                 top_opportunities,
                 x="OPPORTUNITY_VALUE",
                 y="CITY",
@@ -2614,18 +3553,26 @@ with tabs[12]:
                 title="Top 10 Market Opportunities",
                 labels={"OPPORTUNITY_VALUE": "Opportunity Value ($)"},
             )
-            st.plotly_chart(fig_opp, use_container_width=True)
+            st.plotly_chart(fig_opp, use_container_width=True, key="geo_opportunities")
 
         st.subheader("📈 Market Opportunity Details")
-        st.dataframe(market_df, use_container_width=True)
+        render_table_preview(market_df, "market_penetration.csv", key="market_csv")
 
+
+@st.fragment
+def _render_territory_coverage_panel() -> None:
     # Advisor Territory Coverage
     st.subheader("👥 Advisor Territory Coverage & Efficiency")
     territory_df = get_advisor_territory_coverage()
     if not territory_df.empty:
+        coverage_counts, strategy_counts = count_margins(
+            territory_df, "COVERAGE_TYPE", "RECOMMENDED_STRATEGY"
+        )
+
         col1, col2 = st.columns(2)
         with col1:
-            fig_coverage = px.scatter(
+            fig_coverage = cached_px_figure(
+                "scatter",
                 territory_df,
                 x="AVG_TRAVEL_DISTANCE",
                 y="AUM_PER_CLIENT",
@@ -2637,29 +3584,31 @@ with tabs[12]:
                     "AVG_TRAVEL_DISTANCE": "Avg Travel Distance (miles)",
                     "AUM_PER_CLIENT": "AUM per Client ($)",
                 },
+                render_mode="webgl",
             )
-            st.plotly_chart(fig_coverage, use_container_width=True)
+            st.plotly_chart(fig_coverage, use_container_width=True, key="geo_coverage")
 
         with col2:
             # Coverage distribution
-            coverage_dist = territory_df["COVERAGE_TYPE"].value_counts()
             fig_dist = px.pie(
-                values=coverage_dist.values,
-                names=coverage_dist.index,
+                values=coverage_counts.values,
+                names=coverage_counts.index,
                 title="Advisor Coverage Distribution",
             )
-            st.plotly_chart(fig_dist, use_container_width=True)
+            st.plotly_chart(fig_dist, use_container_width=True, key="geo_coverage_mix")
 
         st.subheader("🗺️ Territory Coverage Analysis")
-        st.dataframe(territory_df, use_container_width=True)
+        render_table_preview(
+            territory_df, "territory_coverage.csv", key="territory_csv"
+        )
 
         # Strategy recommendations
-        virtual_advisors = territory_df[
-            territory_df["RECOMMENDED_STRATEGY"] == "Optimize for Virtual Meetings"
-        ]
-        if not virtual_advisors.empty:
+        virtual_advisors = int(
+            strategy_counts.get("Optimize for Virtual Meetings", 0)
+        )
+        if virtual_advisors:
             st.info(
-                f"💡 **Virtual Meeting Optimization**: {len(virtual_advisors)} advisors could benefit from increased virtual client engagement"
+                f"💡 **Virtual Meeting Optimization**: {virtual_advisors} advisors could benefit from increased virtual client engagement"
             )
 
         # Interactive map for advisor coverage
@@ -2675,8 +3624,11 @@ with tabs[12]:
             }
 
             # Prepare data for PyDeck
-            advisor_locations_df["color"] = advisor_locations_df["COVERAGE_TYPE"].map(
-                lambda x: coverage_colors.get(x, [128, 128, 128, 180])
+            # COVERAGE_TYPE is categorical; map plain values so lists are allowed
+            advisor_locations_df["color"] = (
+                advisor_locations_df["COVERAGE_TYPE"]
+                .astype(object)
+                .map(lambda x: coverage_colors.get(x, [128, 128, 128, 180]))
             )
             advisor_locations_df["aum_size"] = (
                 np.log1p(advisor_locations_df["TOTAL_AUM"]) * 50
@@ -2777,6 +3729,42 @@ with tabs[12]:
                 """
                 )
 
+
+def _render_geospatial_tab() -> None:
+    st.subheader("🌍 Geospatial Analytics & Climate Risk")
+    st.caption(
+        "Location-based insights using Snowflake Weather & POI data | KPIs: Geographic AUM distribution, climate risk exposure, market penetration"
+    )
+
+    # Each panel renders into its placeholder as soon as its own loaders
+    # have finished, so the page fills in while slower queries still run,
+    # and the placeholders keep the panels in page order.
+    panels = (
+        (
+            _render_geo_distribution_panel,
+            (get_client_geographic_distribution, get_client_location_details),
+        ),
+        (
+            _render_climate_risk_panel,
+            (
+                get_weather_risk_analysis,
+                get_weather_risk_by_primary,
+                get_weather_risk_by_sector_sensitivity,
+                get_climate_risk_locations,
+            ),
+        ),
+        (_render_market_penetration_panel, (get_market_penetration_analysis,)),
+        (
+            _render_territory_coverage_panel,
+            (get_advisor_territory_coverage, get_advisor_location_details),
+        ),
+    )
+    placeholders = [st.empty() for _ in panels]
+    for index in iter_loaded_groups([loaders for _, loaders in panels]):
+        render_panel, _ = panels[index]
+        with placeholders[index].container():
+            render_panel()
+
     # Integration insights
     st.subheader("🔗 Data Integration Opportunities")
     st.info(
@@ -2794,3 +3782,7 @@ with tabs[12]:
     • Climate scenario modeling for long-term planning
     """
     )
+
+
+with tabs[12]:
+    _render_geospatial_tab()
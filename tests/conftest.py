@@ -0,0 +1,36 @@
+"""Shared fixtures for tests that exercise helpers of the app script."""
+
+import ast
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "streamlit_app_old.py"
+
+
+def _defines(node: ast.stmt, name: str) -> bool:
+    if isinstance(node, ast.FunctionDef):
+        return node.name == name
+    if isinstance(node, ast.Assign):
+        return any(isinstance(t, ast.Name) and t.id == name for t in node.targets)
+    return False
+
+
+def _load_app_object(name: str, namespace: Dict[str, Any]) -> Any:
+    """
+    Compile one top-level function or constant from the app script.
+
+    Importing the script would render the whole dashboard, so only the
+    definition under test is taken from its source.
+    """
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    node = next(n for n in tree.body if _defines(n, name))
+    module = ast.Module(body=[node], type_ignores=[])
+    exec(compile(module, str(APP_PATH), "exec"), namespace)
+    return namespace[name]
+
+
+@pytest.fixture
+def load_app_object() -> Callable[[str, Dict[str, Any]], Any]:
+    return _load_app_object
@@ -0,0 +1,239 @@
+"""
+Pure helpers of the app script that replaced SQL or pandas logic.
+
+Each test pins the helper to the behaviour of what it replaced: the SQL CASE
+ladders, NULL handling, and full-precision money values.
+"""
+
+import itertools
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+pc = pytest.importorskip("pyarrow.compute")
+
+
+def _namespace() -> Dict[str, Any]:
+    return {"np": np, "pd": pd, "pa": pa, "pc": pc, "Tuple": Tuple}
+
+
+@pytest.fixture
+def downcast_table(load_app_object):
+    return load_app_object("_downcast_table", _namespace())
+
+
+@pytest.fixture
+def label_bins(load_app_object):
+    return load_app_object("_label_bins", _namespace())
+
+
+@pytest.fixture
+def binned_counts(load_app_object):
+    return load_app_object("binned_counts", _namespace())
+
+
+# -----------------------------
+# _downcast_table
+# -----------------------------
+
+
+def test_downcast_narrows_int64_that_fits(downcast_table):
+    table = downcast_table(pa.table({"N": pa.array([1, 2, None], pa.int64())}))
+
+    assert table.schema.field("N").type == pa.int32()
+    assert table.column("N").to_pylist() == [1, 2, None]
+
+
+def test_downcast_keeps_int64_on_int32_overflow(downcast_table):
+    values = [0, np.iinfo(np.int32).max + 1]
+    table = downcast_table(pa.table({"N": pa.array(values, pa.int64())}))
+
+    assert table.schema.field("N").type == pa.int64()
+    assert table.column("N").to_pylist() == values
+
+
+def test_downcast_whole_number_decimal_to_int(downcast_table):
+    small = pa.array([Decimal(7), Decimal(-3)], pa.decimal128(38, 0))
+    large = pa.array([Decimal(2**40), Decimal(2**40)], pa.decimal128(38, 0))
+    table = downcast_table(pa.table({"SMALL": small, "LARGE": large}))
+
+    assert table.schema.field("SMALL").type == pa.int32()
+    assert table.schema.field("LARGE").type == pa.int64()
+    assert table.column("LARGE").to_pylist() == [2**40, 2**40]
+
+
+def test_downcast_keeps_money_digits(downcast_table):
+    table = downcast_table(
+        pa.table(
+            {
+                "TOTAL_AUM": pa.array([123456789.12, 9999999.6], pa.float64()),
+                "CASH_BALANCE": pa.array(
+                    [Decimal("123456789.12"), Decimal("9999999.60")],
+                    pa.decimal128(18, 2),
+                ),
+            }
+        )
+    )
+
+    assert table.schema.field("TOTAL_AUM").type == pa.float64()
+    assert table.schema.field("CASH_BALANCE").type == pa.float64()
+    for name in ("TOTAL_AUM", "CASH_BALANCE"):
+        assert table.column(name).to_pylist() == [123456789.12, 9999999.6]
+
+
+def test_downcast_returns_table_untouched_when_nothing_narrows(downcast_table):
+    table = pa.table({"TOTAL_AUM": pa.array([1.5], pa.float64()), "NAME": ["A"]})
+
+    assert downcast_table(table) is table
+
+
+# -----------------------------
+# _label_bins
+# -----------------------------
+
+
+def test_label_bins_nulls_fall_in_lowest_bucket(label_bins, load_app_object):
+    namespace = _namespace()
+    bins = load_app_object("WEALTH_SEGMENT_BINS", namespace)
+    labels = load_app_object("WEALTH_SEGMENT_LABELS", namespace)
+    values = pd.Series([None, np.nan, 100_000, 250_000, 9_999_999.6, 10_000_000])
+
+    result = label_bins(values, bins, labels, right=False)
+
+    assert result.tolist() == [
+        "Emerging Wealth (<$250K)",
+        "Emerging Wealth (<$250K)",
+        "Emerging Wealth (<$250K)",
+        "Mass Affluent ($250K-1M)",
+        "High Net Worth ($5-10M)",
+        "Ultra High Net Worth (>$10M)",
+    ]
+    assert list(result.cat.categories) == labels
+
+
+def test_label_bins_arrow_backed_nulls(label_bins):
+    values = pd.Series([None, 0.07], dtype=pd.ArrowDtype(pa.float64()))
+
+    result = label_bins(values, [-np.inf, 0.05, np.inf], ["Low", "High"])
+
+    assert result.tolist() == ["Low", "High"]
+
+
+# -----------------------------
+# _score_next_best_actions
+# -----------------------------
+
+
+def _case_ladder(
+    aum: Optional[float], n_port: int, days: Optional[float], risk: Optional[str]
+) -> Tuple[str, str]:
+    """The RECOMMENDED_ACTION / PRIORITY CASE expressions the scorer replaced."""
+
+    def gt(value: Optional[float], bound: float) -> bool:
+        # NULL comparisons are never true in SQL
+        return value is not None and value > bound
+
+    if n_port == 0:
+        action = "Portfolio Setup - Start Investment Journey"
+    elif n_port == 1 and gt(aum, 500_000):
+        action = "Diversification - Add Second Portfolio"
+    elif risk == "Conservative" and gt(aum, 1_000_000):
+        action = "Tax Optimization - Municipal Bonds"
+    elif risk in ("Growth", "Aggressive Growth") and n_port < 3:
+        action = "Alternative Investments - REITs/Commodities"
+    elif gt(days, 180):
+        action = "Re-engagement - Portfolio Review Meeting"
+    elif gt(aum, 2_000_000):
+        action = "Wealth Planning - Estate & Trust Services"
+    else:
+        action = "Relationship Deepening - Financial Planning Session"
+
+    if gt(aum, 5_000_000):
+        priority = "High"
+    elif gt(aum, 1_000_000):
+        priority = "Medium"
+    else:
+        priority = "Low"
+    return action, priority
+
+
+def test_score_next_best_actions_matches_case_ladder(load_app_object):
+    namespace = _namespace()
+    score = load_app_object("_score_next_best_actions", namespace)
+    actions = load_app_object("NBA_ACTION_LABELS", namespace)
+    risk_codes = load_app_object("RISK_TOLERANCE_CODES", namespace)
+    priorities = load_app_object("PRIORITY_LABELS", namespace)
+
+    # Every boundary of the ladder, plus NULL AUM / days and unknown risk
+    cases = list(
+        itertools.product(
+            [None, 0, 500_000, 500_001, 1_000_001, 2_000_001, 5_000_000, 5_000_001],
+            [0, 1, 2, 3],
+            [None, 180, 181],
+            risk_codes + [None],
+        )
+    )
+    aum = np.array([np.nan if a is None else a for a, _, _, _ in cases], "float64")
+    n_port = np.array([n for _, n, _, _ in cases], "int64")
+    days = np.array([np.nan if d is None else d for _, _, d, _ in cases], "float64")
+    risk_code = pd.Categorical(
+        [r for _, _, _, r in cases], categories=risk_codes
+    ).codes.astype(np.int8)
+
+    action, priority = score(aum, n_port, days, risk_code)
+
+    got = [(actions[a], priorities[p]) for a, p in zip(action, priority)]
+    assert got == [_case_ladder(*case) for case in cases]
+
+
+# -----------------------------
+# binned_counts
+# -----------------------------
+
+
+def test_binned_counts_right_edge_is_inclusive(binned_counts):
+    values = pd.Series([0.0, 1.0, 2.0, 10.0], name="AUM")
+    groups = pd.Series(["a", "a", "b", "b"], name="SEGMENT")
+
+    result = binned_counts(values, groups, bins=5)
+
+    assert result["N"].sum() == 4
+    # The maximum lands in the last bin (midpoint 9), not past it
+    top = result.loc[result["AUM"] == result["AUM"].max()]
+    assert top[["AUM", "SEGMENT", "N"]].values.tolist() == [[9.0, "b", 1]]
+    assert result.groupby("SEGMENT")["N"].sum().to_dict() == {"a": 2, "b": 2}
+
+
+def test_binned_counts_matches_numpy_histogram(binned_counts):
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.normal(size=500), name="SCORE")
+    groups = pd.Series(np.repeat(["x"], 500), name="KIND")
+
+    result = binned_counts(values, groups, bins=30)
+
+    expected, _ = np.histogram(values, bins=30)
+    assert result["N"].tolist() == expected[expected > 0].tolist()
+
+
+def test_binned_counts_skips_missing_values(binned_counts):
+    values = pd.Series([1.0, None, 3.0], name="AUM")
+    groups = pd.Series(["a", "b", "a"], name="SEGMENT")
+
+    result = binned_counts(values, groups, bins=2)
+
+    assert result["N"].sum() == 2
+    assert set(result["SEGMENT"]) == {"a"}
+
+
+def test_binned_counts_all_nan_is_empty(binned_counts):
+    values = pd.Series([np.nan, None], name="AUM", dtype="float64")
+    groups = pd.Series(["a", "b"], name="SEGMENT")
+
+    result = binned_counts(values, groups)
+
+    assert result.empty
+    assert list(result.columns) == ["AUM", "SEGMENT", "N"]
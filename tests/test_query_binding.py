@@ -0,0 +1,113 @@
+"""
+Bound queries must reach Snowflake through Snowpark's ``?`` binding.
+
+The connector's own cursors default to the pyformat paramstyle, under which
+``?`` placeholders are not bound; the fakes below enforce exactly that.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class PyformatCursor:
+    """Connector cursor with the default pyformat paramstyle."""
+
+    def execute(self, sql: str, params: Any = None) -> "PyformatCursor":
+        if params and "?" in sql:
+            raise TypeError("not all arguments converted during string formatting")
+        return self
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    def cursor(self) -> PyformatCursor:
+        return PyformatCursor()
+
+
+class FakeFrame:
+    """Snowpark DataFrame over rows produced by a qmark-bound statement."""
+
+    def __init__(self, rows: List[Dict[str, Any]], columns: List[str]):
+        self.rows = rows
+        self.columns = columns
+
+    def to_pandas(self) -> "pd.DataFrame":
+        return pd.DataFrame(self.rows, columns=self.columns)
+
+    def to_arrow_batches(self):
+        if self.rows:
+            yield pa.Table.from_pandas(self.to_pandas(), preserve_index=False)
+
+
+class FakeSession:
+    """Binds ``?`` placeholders positionally, as Snowpark's session.sql does."""
+
+    def __init__(self, rows_per_bind: int = 1):
+        self.connection = FakeConnection()
+        self.rows_per_bind = rows_per_bind
+        self.calls: List[Tuple[str, List[Any]]] = []
+
+    def sql(self, sql: str, params: Any = None) -> FakeFrame:
+        values = list(params or [])
+        if sql.count("?") != len(values):
+            raise ValueError("bind count does not match placeholders")
+        self.calls.append((sql, values))
+        rows = [
+            {f"BOUND_{i}": value for i, value in enumerate(values)}
+            for _ in range(self.rows_per_bind)
+        ]
+        return FakeFrame(rows, [f"BOUND_{i}" for i in range(len(values))])
+
+
+@pytest.fixture
+def fetch_arrow(load_app_object):
+    namespace = {"pa": pa, "Session": object, "Sequence": Sequence, "Any": Any}
+    return load_app_object("_fetch_arrow", namespace)
+
+
+def test_fetch_arrow_binds_through_snowpark(fetch_arrow):
+    session = FakeSession()
+    table = fetch_arrow(session, "SELECT ? AS A, ? AS B", (90, 1_000_000))
+
+    assert session.calls == [("SELECT ? AS A, ? AS B", [90, 1_000_000])]
+    assert table.column("BOUND_0").to_pylist() == [90]
+    assert table.column("BOUND_1").to_pylist() == [1_000_000]
+
+
+def test_fetch_arrow_unbound_query(fetch_arrow):
+    session = FakeSession()
+    fetch_arrow(session, "SELECT 1")
+
+    assert session.calls == [("SELECT 1", [])]
+
+
+def test_fetch_arrow_empty_result_keeps_columns(fetch_arrow):
+    session = FakeSession(rows_per_bind=0)
+    table = fetch_arrow(session, "SELECT ? AS A", ("C-1",))
+
+    assert table.num_rows == 0
+    assert table.column_names == ["BOUND_0"]
+
+
+def test_shared_run_query_binds_through_snowpark(monkeypatch):
+    pytest.importorskip("streamlit")
+    pytest.importorskip("snowflake.snowpark")
+    monkeypatch.syspath_prepend(str(REPO_ROOT))
+    from utils import data_functions
+
+    session = FakeSession()
+    monkeypatch.setattr(data_functions, "get_snowflake_session", lambda: session)
+    data_functions.run_query.clear()
+    df = data_functions.run_query("SELECT ? AS A", params=(90,))
+
+    assert session.calls == [("SELECT ? AS A", [90])]
+    assert df["BOUND_0"].tolist() == [90]
@@ -9,7 +9,7 @@ Author: Deepjyoti Dev, Senior Data Cloud Architect, Snowflake GXC Team
 
 import logging
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 import pandas as pd
 import streamlit as st
@@ -71,7 +71,16 @@ def _read_secrets_prefixed(prefix: str) -> Dict[str, Optional[str]]:
     return values
 
 
-@st.cache_resource(show_spinner=False)
+def _is_connection_alive(sess: Session) -> bool:
+    """Local check that the cached session's connection is still open"""
+    try:
+        return not sess.connection.is_closed()
+    except Exception:
+        return False
+
+
+# Validated on each cache hit, so a dropped connection is rebuilt once
+@st.cache_resource(show_spinner=False, validate=_is_connection_alive)
 def get_snowflake_session() -> Session:
     """Get Snowflake session - prioritizes active session in Streamlit in Snowflake"""
     try:
@@ -120,12 +129,17 @@ def get_snowflake_session() -> Session:
 
 
 @st.cache_data(ttl=600, show_spinner=False)
-def run_query(sql: str) -> pd.DataFrame:
-    """Execute SQL query and return results as pandas DataFrame"""
+def run_query(sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+    """
+    Execute SQL query and return results as pandas DataFrame.
+
+    Values are bound positionally to ``?`` placeholders, so the SQL text stays
+    the same across argument values and Snowflake can reuse cached results.
+    """
     try:
         session = get_snowflake_session()
         logger.debug(f"Executing query: {sql[:100]}...")
-        result = session.sql(sql).to_pandas()
+        result = session.sql(sql, params=list(params) or None).to_pandas()
         logger.info(f"Query returned {len(result)} rows")
         return result
     except Exception as e:
@@ -139,46 +153,16 @@ def run_query(sql: str) -> pd.DataFrame:
 # -----------------------------
 
 
+# Shared by the landing page and Business Overview; cached so page switches
+# reuse one result instead of re-assembling the KPI dict
+@st.cache_data(ttl=600, show_spinner=False)
 def get_global_kpis() -> Dict[str, Any]:
     """Calculate firm-level KPIs including client count, advisor count, AUM, and YTD growth"""
-    # Clients
-    clients_df = run_query("SELECT COUNT(DISTINCT CLIENT_ID) AS CNT FROM CLIENTS")
-    num_clients = (
-        int(clients_df.loc[0, "CNT"])
-        if not clients_df.empty and "CNT" in clients_df.columns
-        else 0
-    )
-
-    # Advisors
-    advisors_df = run_query("SELECT COUNT(DISTINCT ADVISOR_ID) AS CNT FROM ADVISORS")
-    num_advisors = (
-        int(advisors_df.loc[0, "CNT"])
-        if not advisors_df.empty and "CNT" in advisors_df.columns
-        else 0
-    )
-
-    # AUM
-    aum_sql = """
-        WITH latest AS (
-            SELECT PORTFOLIO_ID, MAX(TIMESTAMP) AS MAX_TS
-            FROM POSITION_HISTORY
-            GROUP BY PORTFOLIO_ID
-        )
-        SELECT COALESCE(SUM(ph.MARKET_VALUE), 0) AS AUM
-        FROM POSITION_HISTORY ph
-        JOIN latest lt
-          ON ph.PORTFOLIO_ID = lt.PORTFOLIO_ID AND ph.TIMESTAMP = lt.MAX_TS
-        WHERE ph.TICKER <> 'CASH'
-    """
-    aum_df = run_query(aum_sql)
-    aum = (
-        float(aum_df.loc[0, "AUM"])
-        if not aum_df.empty and "AUM" in aum_df.columns
-        else 0.0
-    )
-
-    # YTD growth
-    ytd_sql = """
+    # Single round trip: headcounts and AUM as scalar subqueries, YTD growth
+    # via the ASOF JOIN CTEs. AUM reads the precomputed latest non-cash
+    # snapshot (sql/performance_objects.sql), which picks each portfolio's
+    # MAX(TIMESTAMP) over all rows before dropping cash
+    kpi_sql = """
         WITH port AS (
             SELECT p.PORTFOLIO_ID,
                    TO_TIMESTAMP(DATE_TRUNC('YEAR', CURRENT_DATE)) AS START_OF_YEAR,
@@ -206,20 +190,25 @@ def get_global_kpis() -> Dict[str, Any]:
             MATCH_CONDITION (p.END_DATE >= pv.TIMESTAMP)
             ON p.PORTFOLIO_ID = pv.PORTFOLIO_ID
             GROUP BY 1,2
+        ),
+        ytd AS (
+            SELECT (l.TOT_MARKET_VALUE - s.TOT_MARKET_VALUE)
+                   / NULLIF(s.TOT_MARKET_VALUE, 0) AS YTD_GROWTH_PCT
+            FROM latest_value AS l
+            JOIN start_of_year_value AS s ON (l.JOIN_ID = s.JOIN_ID)
         )
-        SELECT (l.TOT_MARKET_VALUE - s.TOT_MARKET_VALUE)
-               / NULLIF(NULLIF(s.TOT_MARKET_VALUE, 0), 0) AS YTD_GROWTH_PCT
-        FROM latest_value AS l
-        JOIN start_of_year_value AS s ON (l.JOIN_ID = s.JOIN_ID)
+        SELECT (SELECT COUNT(DISTINCT CLIENT_ID) FROM CLIENTS) AS NUM_CLIENTS,
+               (SELECT COUNT(DISTINCT ADVISOR_ID) FROM ADVISORS) AS NUM_ADVISORS,
+               (SELECT COALESCE(SUM(MARKET_VALUE), 0) FROM LATEST_NONCASH_POSITIONS) AS AUM,
+               (SELECT YTD_GROWTH_PCT FROM ytd) AS YTD_GROWTH_PCT
     """
-    ytd_df = run_query(ytd_sql)
-    ytd_growth_pct = (
-        float(ytd_df.loc[0, "YTD_GROWTH_PCT"])
-        if not ytd_df.empty
-        and "YTD_GROWTH_PCT" in ytd_df.columns
-        and pd.notna(ytd_df.loc[0, "YTD_GROWTH_PCT"])
-        else None
-    )
+    kpi_df = run_query(kpi_sql)
+    row = kpi_df.iloc[0] if not kpi_df.empty else pd.Series(dtype=object)
+    ytd = row.get("YTD_GROWTH_PCT")
+    num_clients = int(row.get("NUM_CLIENTS") or 0)
+    num_advisors = int(row.get("NUM_ADVISORS") or 0)
+    aum = float(row.get("AUM") or 0.0)
+    ytd_growth_pct = float(ytd) if pd.notna(ytd) else None
 
     return {
         "num_clients": num_clients,
@@ -679,16 +668,18 @@ def get_trade_fee_anomalies() -> pd.DataFrame:
 
 def get_advisor_productivity(window_days: int = 90) -> pd.DataFrame:
     """Advisor Productivity & Coverage metrics"""
-    sql = f"""
-        WITH client_portfolio_values AS (
+    sql = """
+        WITH latest_positions AS (
+            -- Every row of each portfolio's latest snapshot in a single scan
+            SELECT PORTFOLIO_ID, MARKET_VALUE
+            FROM POSITION_HISTORY
+            QUALIFY TIMESTAMP = MAX(TIMESTAMP) OVER (PARTITION BY PORTFOLIO_ID)
+        ),
+        client_portfolio_values AS (
             SELECT p.CLIENT_ID,
-                   SUM(ph.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
+                   SUM(lp.MARKET_VALUE) AS TOTAL_PORTFOLIO_VALUE
             FROM PORTFOLIOS p
-            JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE ph.TIMESTAMP = (
-                SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
-                WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            )
+            JOIN latest_positions lp ON p.PORTFOLIO_ID = lp.PORTFOLIO_ID
             GROUP BY 1
         ),
         advisor_metrics AS (
@@ -696,7 +687,7 @@ def get_advisor_productivity(window_days: int = 90) -> pd.DataFrame:
                    COUNT(DISTINCT acr.CLIENT_ID) AS TOTAL_CLIENTS,
                    COALESCE(SUM(cpv.TOTAL_PORTFOLIO_VALUE), 0) AS TOTAL_AUM,
                    COUNT(DISTINCT i.INTERACTION_ID) AS TOTAL_INTERACTIONS,
-                   COUNT(DISTINCT CASE WHEN i.TIMESTAMP >= DATEADD(DAY, -{window_days}, CURRENT_DATE)
+                   COUNT(DISTINCT CASE WHEN i.TIMESTAMP >= DATEADD(DAY, -?, CURRENT_DATE)
                                        THEN i.INTERACTION_ID END) AS RECENT_INTERACTIONS
             FROM ADVISORS a
             LEFT JOIN ADVISOR_CLIENT_RELATIONSHIPS acr ON a.ADVISOR_ID = acr.ADVISOR_ID
@@ -711,12 +702,12 @@ def get_advisor_productivity(window_days: int = 90) -> pd.DataFrame:
         FROM advisor_metrics am
         ORDER BY am.TOTAL_AUM DESC
     """
-    return run_query(sql)
+    return run_query(sql, params=(window_days,))
 
 
 def generate_wealth_narrative(client_id: str) -> Dict[str, pd.DataFrame]:
     """Wealth Narrative & Client Briefing - Auto-generate client summaries"""
-    overview_sql = f"""
+    overview_sql = """
         SELECT c.CLIENT_ID, c.FIRST_NAME, c.LAST_NAME, c.RISK_TOLERANCE,
                c.NET_WORTH_ESTIMATE, c.LIFE_EVENT, c.LAST_UPDATE_TIMESTAMP AS LIFE_EVENT_DATE,
                COUNT(DISTINCT p.PORTFOLIO_ID) AS NUM_PORTFOLIOS,
@@ -724,17 +715,17 @@ def generate_wealth_narrative(client_id: str) -> Dict[str, pd.DataFrame]:
         FROM CLIENTS c
         LEFT JOIN PORTFOLIOS p ON c.CLIENT_ID = p.CLIENT_ID
         LEFT JOIN ADVISOR_CLIENT_RELATIONSHIPS acr ON c.CLIENT_ID = acr.CLIENT_ID
-        WHERE c.CLIENT_ID = '{client_id}'
+        WHERE c.CLIENT_ID = ?
         GROUP BY 1, 2, 3, 4, 5, 6, 7
     """
 
-    portfolios_sql = f"""
+    portfolios_sql = """
         WITH portfolio_values AS (
             SELECT p.PORTFOLIO_ID, p.STRATEGY_TYPE,
                    SUM(ph.MARKET_VALUE) AS CURRENT_VALUE
             FROM PORTFOLIOS p
             JOIN POSITION_HISTORY ph ON p.PORTFOLIO_ID = ph.PORTFOLIO_ID
-            WHERE p.CLIENT_ID = '{client_id}'
+            WHERE p.CLIENT_ID = ?
               AND ph.TIMESTAMP = (
                   SELECT MAX(TIMESTAMP) FROM POSITION_HISTORY ph2
                   WHERE ph2.PORTFOLIO_ID = ph.PORTFOLIO_ID
@@ -746,8 +737,8 @@ def generate_wealth_narrative(client_id: str) -> Dict[str, pd.DataFrame]:
     """
 
     return {
-        "overview": run_query(overview_sql),
-        "portfolios": run_query(portfolios_sql),
+        "overview": run_query(overview_sql, params=(client_id,)),
+        "portfolios": run_query(portfolios_sql, params=(client_id,)),
     }
 
 